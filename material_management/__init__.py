@@ -1,2 +1,7 @@
 from . import models
-from . import controllers 
\ No newline at end of file
+from . import controllers
+
+
+def uninstall_hook(cr, registry):
+    """Drop the tables created with raw SQL, which module uninstallation does not remove"""
+    cr.execute("DROP TABLE IF EXISTS material_price_history CASCADE")
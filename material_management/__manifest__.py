@@ -87,10 +87,16 @@
     'depends': ['base'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/material_views.xml',
         'views/supplier_views.xml',
+        'views/material_report_views.xml',
+        'views/material_duplicate_views.xml',
+        'views/api_key_views.xml',
+        'views/slow_request_views.xml',
     ],
     'demo': [],
+    'uninstall_hook': 'uninstall_hook',
     'installable': True,
     'auto_install': False,
     'application': True,
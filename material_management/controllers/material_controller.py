@@ -1,41 +1,153 @@
 # -*- coding: utf-8 -*-
 
+import base64
+import functools
 import json
 import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
 from odoo import http
 from odoo.http import request
+from odoo.fields import Datetime
 from odoo.exceptions import ValidationError, AccessError
 from psycopg2 import IntegrityError
+from psycopg2.extensions import TransactionRollbackError
+
+from ..models.api_key import API_SCOPES
+from ..models.catalog_snapshot import CATALOGS, read_manifest, snapshot_dir
 
 _logger = logging.getLogger(__name__)
 
+# Fields exposed by the material API, in response order
+MATERIAL_API_FIELDS = [
+    'id', 'material_code', 'material_name', 'material_type', 'material_buy_price',
+    'supplier_id', 'supplier_name', 'version',
+]
+
+# material_code may be omitted to have the server allocate one
+MATERIAL_REQUIRED_FIELDS = ['material_name', 'material_type', 'material_buy_price', 'supplier_id']
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Odoo turns every application/json request into a JSON-RPC call, which
+# cannot carry a batch array, so batches use their own content type. It is
+# not CORS-safelisted, so browsers cannot send a batch from another site
+# without a preflight.
+BATCH_CONTENT_TYPE = 'application/json-batch'
+API_KEY_HEADER = 'X-API-Key'
+
+# JSON-RPC 2.0 error codes used by the batch dispatcher
+JSONRPC_INVALID_REQUEST = -32600
+JSONRPC_METHOD_NOT_FOUND = -32601
+JSONRPC_INVALID_PARAMS = -32602
+JSONRPC_SERVER_ERROR = -32000
+
+
+def _integrity_error_message(error_msg):
+    """Convert PostgreSQL constraint violations to user-friendly messages"""
+    if 'material_buy_price_positive' in error_msg:
+        return "Material buy price must be at least 100. Please enter a valid price (≥ 100)."
+    if 'material_code_unique' in error_msg:
+        return "Material code already exists. Please use a unique material code."
+    if 'supplier_name_unique' in error_msg or 'supplier_lower_name_unique' in error_msg:
+        return "Supplier name already exists. Please use a unique supplier name."
+    return "Data integrity constraint violation. Please check your input values."
+
+
+def throttled(route_name):
+    """Apply the route's statement timeout, concurrency limit and the client rate limit.
+
+    Must be placed below ``@http.route``. Rejected requests get a fast 429
+    (rate limited) or 503 (route saturated) with ``Retry-After`` instead of
+    queuing for a worker or a database connection, JSON-RPC routes included. Admitted requests slower
+    than the slow query threshold are recorded in ``material.slow.request``.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            Throttle = request.env['material.api.throttle'].sudo()
+            client_key = self._get_client_key()
+            rejection = Throttle._admit(route_name, client_key)
+            if rejection:
+                return self._throttled_response(*rejection)
+            try:
+                result = request.env['material.slow.request'].sudo()._monitor(
+                    route_name, lambda: func(self, *args, **kwargs), self._get_request_info)
+            except Exception:
+                Throttle._consume_token(client_key, rolled_back=True)
+                raise
+            Throttle._consume_token(client_key)
+            return result
+        return wrapper
+    return decorator
+
+
+def api_key_auth(*scopes):
+    """Authenticate the request by API key and require ``scopes``.
+
+    Must be placed between ``@http.route`` and ``@throttled`` so that rate
+    limits apply per key. The key is read from the ``X-API-Key`` header or
+    ``Authorization: Bearer``, and the request then runs as the key's user
+    with the key's scopes. Without a key the request stays public with the
+    scopes of ``material_management.public_scopes`` (default: all), unless
+    the system parameter ``material_management.api_auth`` is ``api_key``.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            rejection = self._authenticate_api_key(scopes)
+            if rejection:
+                return self._auth_error_response(*rejection)
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class BatchCallError(Exception):
+    """Error raised by a single call of a JSON-RPC batch"""
+
+    def __init__(self, code, message, error_code=400):
+        super(BatchCallError, self).__init__(message)
+        self.code = code
+        self.message = message
+        self.error_code = error_code
+
+
+class IdempotentAttemptFailed(Exception):
+    """Raised to roll back the savepoint of a failed idempotent attempt"""
+
+    def __init__(self, result):
+        super(IdempotentAttemptFailed, self).__init__(result.get('error'))
+        self.result = result
 
 
 class MaterialController(http.Controller):
 
     @http.route('/api/materials', type='http', auth='public', methods=['GET'], csrf=False)
-    def get_materials(self, material_type=None, **kwargs):
+    @api_key_auth('materials:read')
+    @throttled('get_materials')
+    def get_materials(self, material_type=None, include_archived=None, fields=None, **kwargs):
         """Get all materials with optional filtering by material_type via query parameters"""
         try:
+            field_names = self._parse_material_fields(fields)
             domain = []
             
             # Filter by material type if provided via query parameter
             if material_type:
                 domain.append(('material_type', '=', material_type))
             
-            materials = request.env['material.material'].sudo().search(domain)
+            # Archived materials are hidden unless explicitly requested
+            Material = request.env['material.material'].sudo()
+            if include_archived in ('1', 'true', 'True'):
+                Material = Material.with_context(active_test=False)
             
-            result = []
-            for material in materials:
-                result.append({
-                    'id': material.id,
-                    'material_code': material.material_code,
-                    'material_name': material.material_name,
-                    'material_type': material.material_type,
-                    'material_buy_price': material.material_buy_price,
-                    'supplier_id': material.supplier_id.id,
-                    'supplier_name': material.supplier_id.name,
-                })
+            materials = Material.search(domain)
+            
+            result = [self._prepare_material_data(material, field_names) for material in materials]
             
             response_data = {
                 'success': True,
@@ -48,6 +160,8 @@ class MaterialController(http.Controller):
                 headers={'Content-Type': 'application/json'}
             )
             
+        except ValidationError as e:
+            return self._json_response({'success': False, 'error': str(e)}, status=400)
         except Exception as e:
             _logger.error("Error getting materials: %s", str(e))
             response_data = {
@@ -61,9 +175,12 @@ class MaterialController(http.Controller):
             )
 
     @http.route('/api/materials/<int:material_id>', type='http', auth='public', methods=['GET'], csrf=False)
-    def get_material(self, material_id, **kwargs):
+    @api_key_auth('materials:read')
+    @throttled('get_material')
+    def get_material(self, material_id, fields=None, **kwargs):
         """Get a specific material by ID"""
         try:
+            field_names = self._parse_material_fields(fields)
             material = request.env['material.material'].sudo().browse(material_id)
             if not material.exists():
                 response_data = {
@@ -76,26 +193,21 @@ class MaterialController(http.Controller):
                     headers={'Content-Type': 'application/json'}
                 )
             
-            result = {
-                'id': material.id,
-                'material_code': material.material_code,
-                'material_name': material.material_name,
-                'material_type': material.material_type,
-                'material_buy_price': material.material_buy_price,
-                'supplier_id': material.supplier_id.id,
-                'supplier_name': material.supplier_id.name,
-            }
+            result = self._prepare_material_data(material, field_names)
             
             response_data = {
                 'success': True,
                 'data': result
             }
             
+            # The version doubles as ETag so clients can send it back in If-Match
             return request.make_response(
                 json.dumps(response_data),
-                headers={'Content-Type': 'application/json'}
+                headers={'Content-Type': 'application/json', 'ETag': '"%s"' % material.version}
             )
             
+        except ValidationError as e:
+            return self._json_response({'success': False, 'error': str(e)}, status=400)
         except Exception as e:
             _logger.error("Error getting material %s: %s", material_id, str(e))
             response_data = {
@@ -108,17 +220,36 @@ class MaterialController(http.Controller):
                 headers={'Content-Type': 'application/json'}
             )
 
+    @http.route('/api/materials/<int:material_id>/price_history', type='http', auth='public', methods=['GET'], csrf=False)
+    @api_key_auth('materials:read')
+    @throttled('material_price_history')
+    def material_price_history(self, material_id, date_from=None, date_to=None, limit=None, cursor=None, **kwargs):
+        """Get the price changes of a material in [date_from, date_to), page by page"""
+        try:
+            date_from, date_to = self._parse_date_range(date_from, date_to)
+            if not request.env['material.material'].sudo().with_context(active_test=False).browse(material_id).exists():
+                return self._json_response({'success': False, 'error': 'Material not found'}, status=404)
+            
+            return self._price_series_response(date_from, date_to, limit, cursor, material_id=material_id)
+            
+        except ValidationError as e:
+            return self._json_response({'success': False, 'error': str(e)}, status=400)
+        except Exception as e:
+            _logger.error("Error getting price history of material %s: %s", material_id, str(e))
+            return self._json_response({'success': False, 'error': str(e)}, status=500)
+
     @http.route('/api/materials', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('materials:write')
+    @throttled('create_material')
     def create_material(self, **kwargs):
         """Create a new material"""
+        data = self._get_json_params()
+        return self._idempotent('POST /api/materials', data, lambda: self._create_material(data))
+
+    def _create_material(self, data):
         try:
-            # Get JSON data from request - handle both params and direct format
-            raw_data = request.jsonrequest
-            data = raw_data.get('params', raw_data) if 'params' in raw_data else raw_data
-            
             # Validate required fields
-            required_fields = ['material_code', 'material_name', 'material_type', 'material_buy_price', 'supplier_id']
-            for field in required_fields:
+            for field in MATERIAL_REQUIRED_FIELDS:
                 if field not in data:
                     return {
                         'success': False,
@@ -129,15 +260,7 @@ class MaterialController(http.Controller):
             # Create material
             material = request.env['material.material'].sudo().create(data)
             
-            result = {
-                'id': material.id,
-                'material_code': material.material_code,
-                'material_name': material.material_name,
-                'material_type': material.material_type,
-                'material_buy_price': material.material_buy_price,
-                'supplier_id': material.supplier_id.id,
-                'supplier_name': material.supplier_id.name,
-            }
+            result = self._prepare_material_data(material)
             
             return {
                 'success': True,
@@ -153,18 +276,10 @@ class MaterialController(http.Controller):
             }
         except IntegrityError as e:
             error_msg = str(e)
-            # Convert PostgreSQL constraint violations to user-friendly messages
-            if 'material_buy_price_positive' in error_msg:
-                user_friendly_msg = "Material buy price must be at least 100. Please enter a valid price (≥ 100)."
-            elif 'material_code_unique' in error_msg:
-                user_friendly_msg = "Material code already exists. Please use a unique material code."
-            else:
-                user_friendly_msg = "Data integrity constraint violation. Please check your input values."
-            
             _logger.warning("Integrity constraint violation: %s", error_msg)
             return {
                 'success': False,
-                'error': user_friendly_msg,
+                'error': _integrity_error_message(error_msg),
                 'error_code': 400
             }
         except Exception as e:
@@ -176,8 +291,17 @@ class MaterialController(http.Controller):
             }
 
     @http.route('/api/materials/<int:material_id>', type='json', auth='public', methods=['PUT'], csrf=False)
+    @api_key_auth('materials:write')
+    @throttled('update_material')
     def update_material(self, material_id, **kwargs):
         """Update an existing material"""
+        data = self._get_json_params()
+        return self._idempotent(
+            'PUT /api/materials/%s' % material_id, data,
+            lambda: self._update_material(material_id, data)
+        )
+
+    def _update_material(self, material_id, data):
         try:
             material = request.env['material.material'].sudo().browse(material_id)
             if not material.exists():
@@ -187,22 +311,23 @@ class MaterialController(http.Controller):
                     'error_code': 404
                 }
             
-            # Get JSON data from request - handle both params and direct format
-            raw_data = request.jsonrequest
-            data = raw_data.get('params', raw_data) if 'params' in raw_data else raw_data
+            # Optimistic concurrency: only write if the client's version is current
+            values = dict(data)
+            expected_version = self._get_expected_version(values.pop('version', None))
+            if expected_version is None:
+                material.write(values)
+            elif not material.write_if_version(expected_version, values):
+                return {
+                    'success': False,
+                    'error': 'Material was modified by another request. Reload it and retry.',
+                    'error_code': 409,
+                    'data': self._prepare_material_data(material)
+                }
             
-            # Update material
-            material.write(data)
+            # Flush so SQL constraint violations surface here
+            material.flush()
             
-            result = {
-                'id': material.id,
-                'material_code': material.material_code,
-                'material_name': material.material_name,
-                'material_type': material.material_type,
-                'material_buy_price': material.material_buy_price,
-                'supplier_id': material.supplier_id.id,
-                'supplier_name': material.supplier_id.name,
-            }
+            result = self._prepare_material_data(material)
             
             return {
                 'success': True,
@@ -218,18 +343,10 @@ class MaterialController(http.Controller):
             }
         except IntegrityError as e:
             error_msg = str(e)
-            # Convert PostgreSQL constraint violations to user-friendly messages
-            if 'material_buy_price_positive' in error_msg:
-                user_friendly_msg = "Material buy price must be at least 100. Please enter a valid price (≥ 100)."
-            elif 'material_code_unique' in error_msg:
-                user_friendly_msg = "Material code already exists. Please use a unique material code."
-            else:
-                user_friendly_msg = "Data integrity constraint violation. Please check your input values."
-            
             _logger.warning("Integrity constraint violation: %s", error_msg)
             return {
                 'success': False,
-                'error': user_friendly_msg,
+                'error': _integrity_error_message(error_msg),
                 'error_code': 400
             }
         except Exception as e:
@@ -241,6 +358,8 @@ class MaterialController(http.Controller):
             }
 
     @http.route('/api/materials/<int:material_id>', type='json', auth='public', methods=['DELETE'], csrf=False)
+    @api_key_auth('materials:write')
+    @throttled('delete_material')
     def delete_material(self, material_id, **kwargs):
         """Delete a material"""
         try:
@@ -267,26 +386,265 @@ class MaterialController(http.Controller):
                 'error_code': 500
             }
 
-    @http.route('/api/suppliers', type='http', auth='public', methods=['GET'], csrf=False)
-    def get_suppliers(self, **kwargs):
-        """Get all suppliers"""
+    @http.route('/api/materials/autocomplete', type='http', auth='public', methods=['GET'], csrf=False)
+    @api_key_auth()
+    @throttled('autocomplete')
+    def autocomplete(self, q='', model='material', limit=10, **kwargs):
+        """Autocomplete material codes/names or supplier names by prefix.
+
+        Served from the per-worker in-memory index, falling back to an
+        equivalent SQL query while the index is cold.
+        """
         try:
-            suppliers = request.env['material.supplier'].sudo().search([])
+            try:
+                limit = max(1, min(int(limit), 100))
+            except ValueError:
+                return self._json_response({'success': False, 'error': 'limit must be an integer'}, status=400)
+            
+            model_name = {'material': 'material.material', 'supplier': 'material.supplier'}.get(model)
+            if not model_name:
+                return self._json_response({
+                    'success': False,
+                    'error': "model must be 'material' or 'supplier'"
+                }, status=400)
+            
+            scope = 'suppliers:read' if model == 'supplier' else 'materials:read'
+            if not self._has_scope(scope):
+                return self._auth_error_response(*self._scope_error([scope]))
+            
+            Model = request.env[model_name].sudo()
+            source = 'index'
+            matches = Model._autocomplete_search(q, limit) if q else []
+            if matches is None:
+                source = 'sql'
+                matches = Model._autocomplete_sql_search(q, limit)
+            
+            return self._json_response({
+                'success': True,
+                'data': [{'id': record_id, 'label': label} for record_id, label in matches],
+                'count': len(matches),
+                'source': source
+            })
+            
+        except Exception as e:
+            _logger.error("Error autocompleting %s: %s", model, str(e))
+            return self._json_response({'success': False, 'error': str(e)}, status=500)
+
+    @http.route('/api/materials/lookup', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('materials:read')
+    @throttled('lookup_materials')
+    def lookup_materials(self, **kwargs):
+        """Resolve many materials by ID or material code in a single query.
+
+        Params: either ``ids`` or ``codes`` (a list), optional ``fields`` and
+        ``include_archived``. Results keep the request order; unknown keys are
+        returned as ``{"found": false}`` entries.
+        """
+        try:
+            data = self._get_json_params()
+            ids, codes = data.get('ids'), data.get('codes')
+            if (ids is None) == (codes is None):
+                return {
+                    'success': False,
+                    'error': 'Provide either ids or codes',
+                    'error_code': 400
+                }
+            
+            keys = ids if ids is not None else codes
+            key_type = int if ids is not None else str
+            if not isinstance(keys, list) or not all(isinstance(key, key_type) for key in keys):
+                return {
+                    'success': False,
+                    'error': 'ids must be a list of integers' if ids is not None else 'codes must be a list of strings',
+                    'error_code': 400
+                }
+            
+            max_size = int(request.env['ir.config_parameter'].sudo().get_param(
+                'material_management.lookup_max_size', 1000))
+            if len(keys) > max_size:
+                return {
+                    'success': False,
+                    'error': f'Lookup exceeds maximum size of {max_size} keys',
+                    'error_code': 400
+                }
+            
+            field_names = self._parse_material_fields(data.get('fields'))
+            Material = request.env['material.material'].sudo()
+            key_field = 'id' if ids is not None else 'material_code'
+            found = Material._lookup(key_field, keys, include_archived=data.get('include_archived', False))
             
             result = []
-            for supplier in suppliers:
-                result.append({
-                    'id': supplier.id,
-                    'name': supplier.name,
-                    'email': supplier.email,
-                    'phone': supplier.phone,
-                    'address': supplier.address,
-                })
+            for key in keys:
+                material = found.get(key)
+                if material:
+                    result.append({key_field: key, 'found': True, 'data': self._prepare_material_data(material, field_names)})
+                else:
+                    result.append({key_field: key, 'found': False})
+            
+            return {
+                'success': True,
+                'data': result,
+                'count': len(found)
+            }
+            
+        except ValidationError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 400
+            }
+        except Exception as e:
+            _logger.error("Error looking up materials: %s", str(e))
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 500
+            }
+
+    @http.route('/api/materials/bulk_price', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('materials:write')
+    @throttled('bulk_adjust_price')
+    def bulk_adjust_price(self, **kwargs):
+        """Apply a percent or absolute price adjustment to all matching materials at once"""
+        try:
+            data = self._get_json_params()
+            domain = self._bulk_price_domain(data)
+            
+            adjustments = {key: data[key] for key in ('percent', 'amount') if data.get(key) is not None}
+            if len(adjustments) != 1:
+                raise ValidationError("Provide either a percent or an amount price adjustment.")
+            key, value = adjustments.popitem()
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValidationError("%s must be a number" % key)
+            
+            with request.env.cr.savepoint():
+                result = request.env['material.material'].sudo().bulk_adjust_price(
+                    domain,
+                    dry_run=data.get('dry_run', False),
+                    **{key: value}
+                )
+            
+            if result['violations']:
+                return {
+                    'success': False,
+                    'error': 'Adjustment would bring %s material(s) below the minimum price of 100. Nothing was updated.' % len(result['violations']),
+                    'error_code': 400,
+                    'data': result
+                }
+            
+            return {
+                'success': True,
+                'message': 'Dry run completed' if result['dry_run'] else 'Prices adjusted successfully',
+                'data': result
+            }
+            
+        except ValidationError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 400
+            }
+        except TransactionRollbackError:
+            return {
+                'success': False,
+                'error': 'Matching materials were changed by another request. Nothing was updated, please retry.',
+                'error_code': 409
+            }
+        except IntegrityError as e:
+            _logger.warning("Integrity constraint violation: %s", str(e))
+            return {
+                'success': False,
+                'error': _integrity_error_message(str(e)),
+                'error_code': 400
+            }
+        except Exception as e:
+            _logger.error("Error adjusting material prices: %s", str(e))
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 500
+            }
+
+    @http.route('/api/materials/prices_as_of', type='http', auth='public', methods=['GET'], csrf=False)
+    @api_key_auth('materials:read')
+    @throttled('prices_as_of')
+    def prices_as_of(self, date=None, supplier_id=None, material_type=None, **kwargs):
+        """Get the price of every active material as it was at a given date"""
+        try:
+            if not date:
+                raise ValidationError("date is required")
+            as_of = self._parse_datetime(date, 'date')
+            try:
+                supplier_id = int(supplier_id) if supplier_id else None
+            except ValueError:
+                raise ValidationError("supplier_id must be an integer")
+            
+            result = request.env['material.price.history'].sudo().get_prices_as_of(
+                as_of, supplier_id=supplier_id, material_type=material_type)
+            return self._json_response({'success': True, 'data': result, 'count': len(result)})
+            
+        except ValidationError as e:
+            return self._json_response({'success': False, 'error': str(e)}, status=400)
+        except Exception as e:
+            _logger.error("Error getting prices as of %s: %s", date, str(e))
+            return self._json_response({'success': False, 'error': str(e)}, status=500)
+
+    @http.route('/api/materials/<int:material_id>/archive', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('materials:write')
+    @throttled('archive_material')
+    def archive_material(self, material_id, **kwargs):
+        """Archive a material so it is hidden from listings but kept in history"""
+        return self._set_active('material.material', material_id, False)
+
+    @http.route('/api/materials/<int:material_id>/unarchive', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('materials:write')
+    @throttled('unarchive_material')
+    def unarchive_material(self, material_id, **kwargs):
+        """Restore an archived material"""
+        return self._set_active('material.material', material_id, True)
+
+    @http.route('/api/suppliers', type='http', auth='public', methods=['GET'], csrf=False)
+    @api_key_auth('suppliers:read')
+    @throttled('get_suppliers')
+    def get_suppliers(self, include_archived=None, name=None, limit=None, cursor=None, **kwargs):
+        """Get all suppliers, page by page when ``limit`` or ``cursor`` is given, or the one matching ``name``"""
+        try:
+            Supplier = request.env['material.supplier'].sudo()
+            include_archived = include_archived in ('1', 'true', 'True')
+            next_cursor = None
+            
+            if name is not None:
+                suppliers = Supplier._find_by_name(name, include_archived=include_archived)
+            elif limit or cursor:
+                max_limit = int(request.env['ir.config_parameter'].sudo().get_param(
+                    'material_management.supplier_page_size', 100))
+                try:
+                    limit = min(int(limit), max_limit) if limit else max_limit
+                except ValueError:
+                    raise ValidationError("limit must be an integer")
+                if limit < 1:
+                    raise ValidationError("limit must be positive")
+                after = None
+                if cursor:
+                    try:
+                        lower_name, supplier_id = json.loads(self._decode_cursor(cursor))
+                        after = (str(lower_name), int(supplier_id))
+                    except (ValueError, TypeError):
+                        raise ValidationError("Invalid cursor")
+                
+                suppliers, next_key = Supplier._search_page(after, limit, include_archived=include_archived)
+                if next_key is not None:
+                    next_cursor = self._encode_cursor(json.dumps(list(next_key)))
+            else:
+                suppliers = Supplier.with_context(active_test=not include_archived).search([])
+            
+            result = [self._prepare_supplier_data(supplier) for supplier in suppliers]
             
             response_data = {
                 'success': True,
                 'data': result,
-                'count': len(result)
+                'count': len(result),
+                'next_cursor': next_cursor
             }
             
             return request.make_response(
@@ -294,6 +652,8 @@ class MaterialController(http.Controller):
                 headers={'Content-Type': 'application/json'}
             )
             
+        except ValidationError as e:
+            return self._json_response({'success': False, 'error': str(e)}, status=400)
         except Exception as e:
             _logger.error("Error getting suppliers: %s", str(e))
             response_data = {
@@ -306,14 +666,34 @@ class MaterialController(http.Controller):
                 headers={'Content-Type': 'application/json'}
             )
 
+    @http.route('/api/suppliers/<int:supplier_id>/price_history', type='http', auth='public', methods=['GET'], csrf=False)
+    @api_key_auth('suppliers:read', 'materials:read')
+    @throttled('supplier_price_history')
+    def supplier_price_history(self, supplier_id, date_from=None, date_to=None, limit=None, cursor=None, **kwargs):
+        """Get the price changes of a supplier's materials in [date_from, date_to), page by page"""
+        try:
+            date_from, date_to = self._parse_date_range(date_from, date_to)
+            if not request.env['material.supplier'].sudo().with_context(active_test=False).browse(supplier_id).exists():
+                return self._json_response({'success': False, 'error': 'Supplier not found'}, status=404)
+            
+            return self._price_series_response(date_from, date_to, limit, cursor, supplier_id=supplier_id)
+            
+        except ValidationError as e:
+            return self._json_response({'success': False, 'error': str(e)}, status=400)
+        except Exception as e:
+            _logger.error("Error getting price history of supplier %s: %s", supplier_id, str(e))
+            return self._json_response({'success': False, 'error': str(e)}, status=500)
+
     @http.route('/api/suppliers', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('suppliers:write')
+    @throttled('create_supplier')
     def create_supplier(self, **kwargs):
         """Create a new supplier"""
+        data = self._get_json_params()
+        return self._idempotent('POST /api/suppliers', data, lambda: self._create_supplier(data))
+
+    def _create_supplier(self, data):
         try:
-            # Get JSON data from request - handle both params and direct format
-            raw_data = request.jsonrequest
-            data = raw_data.get('params', raw_data) if 'params' in raw_data else raw_data
-            
             # Validate required fields
             if 'name' not in data:
                 return {
@@ -325,13 +705,7 @@ class MaterialController(http.Controller):
             # Create supplier
             supplier = request.env['material.supplier'].sudo().create(data)
             
-            result = {
-                'id': supplier.id,
-                'name': supplier.name,
-                'email': supplier.email,
-                'phone': supplier.phone,
-                'address': supplier.address,
-            }
+            result = self._prepare_supplier_data(supplier)
             
             return {
                 'success': True,
@@ -347,16 +721,10 @@ class MaterialController(http.Controller):
             }
         except IntegrityError as e:
             error_msg = str(e)
-            # Convert PostgreSQL constraint violations to user-friendly messages
-            if 'supplier_name_unique' in error_msg:
-                user_friendly_msg = "Supplier name already exists. Please use a unique supplier name."
-            else:
-                user_friendly_msg = "Data integrity constraint violation. Please check your input values."
-            
             _logger.warning("Integrity constraint violation: %s", error_msg)
             return {
                 'success': False,
-                'error': user_friendly_msg,
+                'error': _integrity_error_message(error_msg),
                 'error_code': 400
             }
         except Exception as e:
@@ -365,4 +733,674 @@ class MaterialController(http.Controller):
                 'success': False,
                 'error': str(e),
                 'error_code': 500
-            } 
\ No newline at end of file
+            } 
+
+    @http.route('/api/suppliers/onboard', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('suppliers:write', 'materials:write')
+    @throttled('onboard_supplier')
+    def onboard_supplier(self, **kwargs):
+        """Create a supplier together with its materials in one transaction"""
+        data = self._get_json_params()
+        return self._idempotent('POST /api/suppliers/onboard', data, lambda: self._onboard_supplier(data))
+
+    def _onboard_supplier(self, data):
+        """Create the supplier, then all of its ``materials`` in one multi-row INSERT.
+
+        Either everything is created or nothing: a failing material rolls back
+        the supplier as well.
+        """
+        materials_data = data.get('materials') or []
+        supplier_data = {key: value for key, value in data.items() if key != 'materials'}
+        if 'name' not in supplier_data:
+            return {
+                'success': False,
+                'error': 'Missing required field: name',
+                'error_code': 400
+            }
+        if not isinstance(materials_data, list) or not all(isinstance(item, dict) for item in materials_data):
+            return {
+                'success': False,
+                'error': 'materials must be a list of objects',
+                'error_code': 400
+            }
+        
+        max_materials = int(request.env['ir.config_parameter'].sudo().get_param(
+            'material_management.onboard_max_materials', 5000))
+        if len(materials_data) > max_materials:
+            return {
+                'success': False,
+                'error': f'Onboarding accepts at most {max_materials} materials per request',
+                'error_code': 400
+            }
+        for index, material_data in enumerate(materials_data):
+            for field in MATERIAL_REQUIRED_FIELDS:
+                if field != 'supplier_id' and field not in material_data:
+                    return {
+                        'success': False,
+                        'error': f'materials[{index}]: Missing required field: {field}',
+                        'error_code': 400
+                    }
+        
+        try:
+            with request.env.cr.savepoint():
+                supplier = request.env['material.supplier'].sudo().create(supplier_data)
+                materials = request.env['material.material'].sudo()._bulk_create([
+                    dict(material_data, supplier_id=supplier.id) for material_data in materials_data
+                ])
+            
+            return {
+                'success': True,
+                'message': f'Supplier created successfully with {len(materials)} materials',
+                'data': {
+                    'supplier': self._prepare_supplier_data(supplier),
+                    'materials': [
+                        {'id': material.id, 'material_code': material.material_code}
+                        for material in materials
+                    ],
+                }
+            }
+            
+        except ValidationError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 400
+            }
+        except IntegrityError as e:
+            error_msg = str(e)
+            _logger.warning("Integrity constraint violation: %s", error_msg)
+            return {
+                'success': False,
+                'error': _integrity_error_message(error_msg),
+                'error_code': 400
+            }
+        except Exception as e:
+            _logger.error("Error onboarding supplier: %s", str(e))
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 500
+            }
+
+    @http.route('/api/suppliers/<int:supplier_id>/archive', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('suppliers:write')
+    @throttled('archive_supplier')
+    def archive_supplier(self, supplier_id, **kwargs):
+        """Archive a supplier so it is hidden from listings but kept in history"""
+        return self._set_active('material.supplier', supplier_id, False)
+
+    @http.route('/api/suppliers/<int:supplier_id>/unarchive', type='json', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth('suppliers:write')
+    @throttled('unarchive_supplier')
+    def unarchive_supplier(self, supplier_id, **kwargs):
+        """Restore an archived supplier"""
+        return self._set_active('material.supplier', supplier_id, True)
+
+    @http.route('/api/snapshots', type='http', auth='public', methods=['GET'], csrf=False)
+    @api_key_auth()
+    def get_snapshots(self, **kwargs):
+        """List the latest snapshots of the catalogs the request may read"""
+        manifest = read_manifest(request.db)
+        return self._json_response({
+            'success': True,
+            'data': {
+                catalog: entry for catalog, entry in manifest.items()
+                if self._has_scope('%s:read' % catalog)
+            }
+        })
+
+    @http.route('/api/snapshots/<string:catalog>', type='http', auth='public', methods=['GET'], csrf=False)
+    @api_key_auth()
+    def get_snapshot(self, catalog, format='json.gz', **kwargs):
+        """Serve the latest precomputed catalog snapshot as a static file.
+
+        Requires the ``<catalog>:read`` scope. Besides the API key check,
+        which is served from the worker's caches, only the filestore is read,
+        so heavy export traffic runs no queries.
+        """
+        if catalog in CATALOGS and not self._has_scope('%s:read' % catalog):
+            return self._auth_error_response(*self._scope_error(['%s:read' % catalog]))
+        entry = read_manifest(request.db).get(catalog)
+        if not entry or format not in entry['files']:
+            return self._json_response({
+                'success': False,
+                'error': 'Snapshot not found'
+            }, status=404)
+        
+        filename = entry['files'][format]
+        headers = [
+            ('ETag', '"%s"' % entry['version']),
+            ('Cache-Control', 'public, max-age=60'),
+            ('X-Snapshot-Generated-At', entry['generated_at']),
+        ]
+        if entry['version'] in request.httprequest.if_none_match:
+            return Response(status=304, headers=headers)
+        
+        path = os.path.join(snapshot_dir(request.db), filename)
+        try:
+            snapshot = open(path, 'rb')
+        except IOError:
+            # Purged between reading the manifest and opening the file
+            return self._json_response({
+                'success': False,
+                'error': 'Snapshot not found'
+            }, status=404)
+        
+        headers += [
+            ('Content-Length', str(os.fstat(snapshot.fileno()).st_size)),
+            ('Content-Disposition', 'attachment; filename=%s' % filename),
+        ]
+        return Response(
+            wrap_file(request.httprequest.environ, snapshot),
+            headers=headers,
+            mimetype='application/gzip' if format == 'json.gz' else 'application/vnd.apache.parquet',
+            direct_passthrough=True
+        )
+
+    @http.route('/api/batch', type='http', auth='public', methods=['POST'], csrf=False)
+    @api_key_auth()
+    @throttled('batch')
+    def batch(self, mode='transaction', **kwargs):
+        """Execute a JSON-RPC 2.0 batch of material/supplier calls in one request.
+
+        The body is a JSON array of calls such as
+        ``{"jsonrpc": "2.0", "method": "material.create", "params": {...}, "id": 1}``,
+        sent as ``Content-Type: application/json-batch``.
+        With ``mode=transaction`` (default) the batch is all-or-nothing; with
+        ``mode=savepoint`` each call runs in its own savepoint so failing calls
+        are rolled back individually.
+        """
+        if request.httprequest.mimetype != BATCH_CONTENT_TYPE:
+            return self._json_response({
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {'code': JSONRPC_INVALID_REQUEST, 'message': 'Content-Type must be application/json-batch'}
+            }, status=415)
+        
+        try:
+            calls = json.loads(request.httprequest.get_data() or b'null')
+        except ValueError:
+            return self._json_response({
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {'code': -32700, 'message': 'Parse error'}
+            }, status=400)
+        
+        if not isinstance(calls, list) or not calls:
+            return self._json_response({
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {'code': JSONRPC_INVALID_REQUEST, 'message': 'Batch must be a non-empty JSON array'}
+            }, status=400)
+        
+        if mode not in ('transaction', 'savepoint'):
+            return self._json_response({
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {'code': JSONRPC_INVALID_REQUEST, 'message': "mode must be 'transaction' or 'savepoint'"}
+            }, status=400)
+        
+        max_size = int(request.env['ir.config_parameter'].sudo().get_param(
+            'material_management.batch_max_size', 500))
+        if len(calls) > max_size:
+            return self._json_response({
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {'code': JSONRPC_INVALID_REQUEST, 'message': f'Batch exceeds maximum size of {max_size} calls'}
+            }, status=400)
+        
+        self._allocate_batch_material_codes(calls)
+        
+        cr = request.env.cr
+        responses = []
+        if mode == 'savepoint':
+            for call in calls:
+                try:
+                    with cr.savepoint():
+                        result = self._dispatch_batch_call(call)
+                    responses.append(self._batch_result(call, result))
+                except Exception as e:
+                    responses.append(self._batch_error(call, e))
+        else:
+            current = None
+            try:
+                with cr.savepoint():
+                    for call in calls:
+                        current = call
+                        responses.append(self._batch_result(call, self._dispatch_batch_call(call)))
+            except Exception as e:
+                # One failure rolls back the whole batch: report the failing
+                # call's error and mark every other call as rolled back
+                failed = self._batch_error(current, e)
+                responses = []
+                for call in calls:
+                    if call is current:
+                        responses.append(failed)
+                    else:
+                        responses.append(self._batch_error(call, None))
+        
+        # Notifications (calls without an id) get no response entry
+        responses = [
+            response for call, response in zip(calls, responses)
+            if not isinstance(call, dict) or 'id' in call
+        ]
+        return self._json_response(responses)
+
+    def _dispatch_batch_call(self, call):
+        """Run a single batch call and return its result, raising on failure"""
+        if not isinstance(call, dict) or call.get('jsonrpc') != '2.0' or not isinstance(call.get('method'), str):
+            raise BatchCallError(JSONRPC_INVALID_REQUEST, 'Invalid Request')
+        
+        handler, scope = {
+            'material.create': (self._batch_create_material, 'materials:write'),
+            'material.update': (self._batch_update_material, 'materials:write'),
+            'material.delete': (self._batch_delete_material, 'materials:write'),
+            'supplier.create': (self._batch_create_supplier, 'suppliers:write'),
+        }.get(call['method'], (None, None))
+        if not handler:
+            raise BatchCallError(JSONRPC_METHOD_NOT_FOUND, f"Method not found: {call['method']}")
+        if not self._has_scope(scope):
+            status, error = self._scope_error([scope])
+            raise BatchCallError(JSONRPC_INVALID_REQUEST, error, status)
+        
+        params = call.get('params') or {}
+        if not isinstance(params, dict):
+            raise BatchCallError(JSONRPC_INVALID_PARAMS, 'params must be an object')
+        return handler(dict(params))
+
+    def _allocate_batch_material_codes(self, calls):
+        """Fill in missing codes of the batch's material creations, one block of codes per material type"""
+        missing_codes = defaultdict(list)
+        for call in calls:
+            if not isinstance(call, dict) or call.get('method') != 'material.create':
+                continue
+            params = call.get('params')
+            if isinstance(params, dict) and not params.get('material_code') and isinstance(params.get('material_type'), str):
+                missing_codes[params['material_type']].append(params)
+        
+        Material = request.env['material.material'].sudo()
+        for material_type, params_list in missing_codes.items():
+            codes = Material._allocate_material_codes(material_type, len(params_list))
+            for params, code in zip(params_list, codes):
+                params['material_code'] = code
+
+    def _batch_create_material(self, params):
+        for field in MATERIAL_REQUIRED_FIELDS:
+            if field not in params:
+                raise BatchCallError(JSONRPC_INVALID_PARAMS, f'Missing required field: {field}', 400)
+        material = request.env['material.material'].sudo().create(params)
+        return self._prepare_material_data(material)
+
+    def _batch_update_material(self, params):
+        material = self._batch_browse('material.material', params.pop('id', None))
+        expected_version = params.pop('version', None)
+        if expected_version is not None and not isinstance(expected_version, int):
+            raise BatchCallError(JSONRPC_INVALID_PARAMS, 'version must be an integer', 400)
+        if expected_version is None:
+            material.write(params)
+        elif not material.write_if_version(expected_version, params):
+            raise BatchCallError(JSONRPC_SERVER_ERROR, 'Material was modified by another request. Reload it and retry.', 409)
+        # Flush so SQL constraint violations are reported for this call
+        material.flush()
+        return self._prepare_material_data(material)
+
+    def _batch_delete_material(self, params):
+        material = self._batch_browse('material.material', params.get('id'))
+        material.unlink()
+        return {'id': params['id']}
+
+    def _batch_create_supplier(self, params):
+        if 'name' not in params:
+            raise BatchCallError(JSONRPC_INVALID_PARAMS, 'Missing required field: name', 400)
+        supplier = request.env['material.supplier'].sudo().create(params)
+        return self._prepare_supplier_data(supplier)
+
+    def _batch_browse(self, model_name, record_id):
+        if not isinstance(record_id, int):
+            raise BatchCallError(JSONRPC_INVALID_PARAMS, 'Missing or invalid field: id', 400)
+        record = request.env[model_name].sudo().browse(record_id)
+        if not record.exists():
+            label = 'Material' if model_name == 'material.material' else 'Supplier'
+            raise BatchCallError(JSONRPC_SERVER_ERROR, f'{label} not found', 404)
+        return record
+
+    def _batch_result(self, call, result):
+        return {
+            'jsonrpc': '2.0',
+            'id': call.get('id'),
+            'result': {
+                'success': True,
+                'data': result
+            }
+        }
+
+    def _batch_error(self, call, error):
+        """Build a JSON-RPC error entry; ``error=None`` means rolled back with the batch"""
+        if error is None:
+            code, message, error_code = JSONRPC_SERVER_ERROR, 'Not executed: batch rolled back', 409
+        elif isinstance(error, BatchCallError):
+            code, message, error_code = error.code, error.message, error.error_code
+        elif isinstance(error, ValidationError):
+            code, message, error_code = JSONRPC_SERVER_ERROR, str(error), 400
+        elif isinstance(error, IntegrityError):
+            _logger.warning("Integrity constraint violation: %s", str(error))
+            code, message, error_code = JSONRPC_SERVER_ERROR, _integrity_error_message(str(error)), 400
+        else:
+            _logger.error("Error executing batch call: %s", str(error))
+            code, message, error_code = JSONRPC_SERVER_ERROR, str(error), 500
+        return {
+            'jsonrpc': '2.0',
+            'id': call.get('id') if isinstance(call, dict) else None,
+            'error': {
+                'code': code,
+                'message': message,
+                'data': {'error_code': error_code}
+            }
+        }
+
+    def _bulk_price_domain(self, data):
+        """Build the bulk price adjustment filter; refuse to match the whole catalog implicitly.
+
+        At least one of ``supplier_id``, ``material_type`` or ``material_ids``
+        is required, unless ``all`` is ``true``.
+        """
+        domain = []
+        if 'supplier_id' in data:
+            if isinstance(data['supplier_id'], bool) or not isinstance(data['supplier_id'], int):
+                raise ValidationError("supplier_id must be an integer")
+            domain.append(('supplier_id', '=', data['supplier_id']))
+        if 'material_type' in data:
+            if not data['material_type'] or not isinstance(data['material_type'], str):
+                raise ValidationError("material_type must be a material type")
+            domain.append(('material_type', '=', data['material_type']))
+        if 'material_ids' in data:
+            material_ids = data['material_ids']
+            if not isinstance(material_ids, list) or not material_ids or \
+                    not all(isinstance(material_id, int) and not isinstance(material_id, bool) for material_id in material_ids):
+                raise ValidationError("material_ids must be a non-empty list of integers")
+            domain.append(('id', 'in', material_ids))
+        if not domain and data.get('all') is not True:
+            raise ValidationError('Provide supplier_id, material_type or material_ids, '
+                                  'or "all": true to adjust every material')
+        return domain
+
+    def _get_expected_version(self, body_version=None):
+        """Return the version the client expects to update, if any.
+
+        Taken from the ``If-Match`` header (``"3"`` or ``W/"3"``) or from a
+        ``version`` value in the request body.
+        """
+        value = request.httprequest.headers.get('If-Match') or body_version
+        if value is None or value == '*':
+            return None
+        try:
+            return int(str(value).strip().lstrip('W/').strip('"'))
+        except ValueError:
+            raise ValidationError("Invalid version '%s'. If-Match must contain the material version." % value)
+
+    def _get_json_params(self):
+        """Get JSON data from request - handle both params and direct format"""
+        raw_data = request.jsonrequest
+        return raw_data.get('params', raw_data) if 'params' in raw_data else raw_data
+
+    def _idempotent(self, endpoint, data, execute):
+        """Run ``execute`` at most once per ``Idempotency-Key`` header value.
+
+        The key is reserved and the successful response stored inside one
+        savepoint together with the write itself, so a retry either replays
+        the stored response or, if the first attempt failed or never
+        committed, executes again. Failed attempts are rolled back and not
+        stored. Keys are scoped to the calling API key, or user without one.
+        When a concurrent attempt with the same key commits first, the
+        request answers 409 so the client retries and gets the replay.
+        """
+        key = request.httprequest.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return execute()
+        
+        Store = request.env['material.idempotency.key'].sudo()
+        request_hash = Store._hash_request(data)
+        api_key = getattr(request, 'material_api_key', None)
+        client = 'key:%s' % api_key[0] if api_key else 'user:%s' % request.uid
+        retry = {
+            'success': False,
+            'error': 'A concurrent request with this Idempotency-Key has just completed, please retry',
+            'error_code': 409
+        }
+        try:
+            with request.env.cr.savepoint():
+                entry, created = Store._reserve(key, endpoint, client, request_hash)
+                if not entry:
+                    return retry
+                if not created:
+                    if entry.request_hash != request_hash:
+                        return {
+                            'success': False,
+                            'error': 'Idempotency-Key was already used with a different request payload',
+                            'error_code': 422
+                        }
+                    return entry._get_response()
+                
+                result = execute()
+                if not result.get('success'):
+                    raise IdempotentAttemptFailed(result)
+                entry._store_response(result)
+                return result
+        except IdempotentAttemptFailed as e:
+            return e.result
+        except TransactionRollbackError:
+            return retry
+
+    def _authenticate_api_key(self, scopes):
+        """Resolve the request's API key and scopes; return None or ``(status, error)``"""
+        key = request.httprequest.headers.get(API_KEY_HEADER)
+        authorization = request.httprequest.headers.get('Authorization', '')
+        if not key and authorization.startswith('Bearer '):
+            key = authorization[len('Bearer '):].strip()
+        if key:
+            resolved = request.env['material.api.key'].sudo()._resolve(key)
+            if not resolved:
+                return 401, 'Invalid or revoked API key'
+            request.uid = resolved[1]
+            request.material_api_key = resolved
+            request.material_api_scopes = resolved[2]
+        else:
+            ICP = request.env['ir.config_parameter'].sudo()
+            if ICP.get_param('material_management.api_auth', 'public') == 'api_key':
+                return 401, 'API key required'
+            request.material_api_scopes = frozenset(
+                ICP.get_param('material_management.public_scopes', ' '.join(API_SCOPES)).split())
+        
+        missing = [scope for scope in scopes if not self._has_scope(scope)]
+        if missing:
+            return self._scope_error(missing)
+        return None
+
+    def _has_scope(self, scope):
+        """Whether the request may use ``scope``: with a key, the key's scopes, else the public scopes"""
+        return scope in getattr(request, 'material_api_scopes', ())
+
+    def _scope_error(self, scopes):
+        """Return the ``(status, error)`` of a request missing ``scopes``"""
+        if getattr(request, 'material_api_key', None):
+            return 403, 'API key lacks scope: %s' % ', '.join(scopes)
+        return 401, 'API key required for scope: %s' % ', '.join(scopes)
+
+    def _auth_error_response(self, status, error):
+        if request._request_type == 'json':
+            return {
+                'success': False,
+                'error': error,
+                'error_code': status
+            }
+        response = self._json_response({'success': False, 'error': error}, status=status)
+        if status == 401:
+            response.headers['WWW-Authenticate'] = 'Bearer'
+        return response
+
+    def _get_request_info(self):
+        """Describe the current request for slow request records"""
+        if request._request_type == 'json':
+            params = request.jsonrequest
+        else:
+            params = request.httprequest.args.to_dict()
+            if request.httprequest.method != 'GET':
+                params['body'] = request.httprequest.get_data(as_text=True)
+        return {
+            'method': request.httprequest.method,
+            'path': request.httprequest.path,
+            'params': params,
+            'user_id': request.uid,
+        }
+
+    def _get_client_key(self):
+        """Identify the calling client for rate limiting: its API key, else its IP address"""
+        api_key = getattr(request, 'material_api_key', None)
+        if api_key:
+            return 'key:%s' % api_key[0]
+        return 'ip:%s' % request.httprequest.remote_addr
+
+    def _throttled_response(self, status, retry_after):
+        error = 'Too many requests, please retry later' if status == 429 else 'Service busy, please retry later'
+        if request._request_type == 'json':
+            # Applied to the JSON-RPC response by ir.http
+            request.material_response_status = (status, {'Retry-After': str(retry_after)})
+            return {
+                'success': False,
+                'error': error,
+                'error_code': status,
+                'retry_after': retry_after
+            }
+        response = self._json_response({'success': False, 'error': error}, status=status)
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    def _price_series_response(self, date_from, date_to, limit, cursor, **owner):
+        """Return one page of a price series, with the cursor of the next page if it was cut"""
+        max_limit = int(request.env['ir.config_parameter'].sudo().get_param(
+            'material_management.price_history_page_size', 10000))
+        try:
+            limit = min(int(limit), max_limit) if limit else max_limit
+        except ValueError:
+            raise ValidationError("limit must be an integer")
+        if limit < 1:
+            raise ValidationError("limit must be positive")
+        after = None
+        if cursor:
+            try:
+                changed_at, history_id = self._decode_cursor(cursor).rsplit(',', 1)
+                after = (datetime.fromisoformat(changed_at), int(history_id))
+            except ValueError:
+                raise ValidationError("Invalid cursor")
+
+        result, next_key = request.env['material.price.history'].sudo().get_series(
+            date_from, date_to, limit=limit, after=after, **owner)
+        next_cursor = None
+        if next_key:
+            next_cursor = self._encode_cursor('%s,%s' % (next_key[0].isoformat(' '), next_key[1]))
+        return self._json_response({
+            'success': True,
+            'data': result,
+            'count': len(result),
+            'next_cursor': next_cursor
+        })
+
+    def _parse_datetime(self, value, name):
+        try:
+            return Datetime.to_datetime(value)
+        except ValueError:
+            raise ValidationError("%s must be a date (YYYY-MM-DD) or datetime (YYYY-MM-DD HH:MM:SS)" % name)
+
+    def _parse_date_range(self, date_from, date_to):
+        """Parse the [date_from, date_to) range of a series query; date_to defaults to now"""
+        if not date_from:
+            raise ValidationError("date_from is required")
+        date_from = self._parse_datetime(date_from, 'date_from')
+        date_to = self._parse_datetime(date_to, 'date_to') if date_to else Datetime.now()
+        if date_from >= date_to:
+            raise ValidationError("date_from must be before date_to")
+        return date_from, date_to
+
+    def _json_response(self, data, status=200):
+        return request.make_response(
+            json.dumps(data),
+            status=status,
+            headers={'Content-Type': 'application/json'}
+        )
+
+    def _parse_material_fields(self, fields):
+        """Parse the sparse ``fields`` selection (comma separated string or list)"""
+        if not fields:
+            return None
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in MATERIAL_API_FIELDS]
+        if unknown:
+            raise ValidationError("Unknown field(s): %s. Available fields: %s" % (
+                ', '.join(map(str, unknown)), ', '.join(MATERIAL_API_FIELDS)))
+        return fields
+
+    def _prepare_material_data(self, material, fields=None):
+        """Serialize a material record for API responses, optionally limited to ``fields``"""
+        data = {}
+        for field in fields or MATERIAL_API_FIELDS:
+            if field == 'supplier_id':
+                data[field] = material.supplier_id.id
+            elif field == 'supplier_name':
+                data[field] = material.supplier_id.name
+            else:
+                data[field] = material[field]
+        return data
+
+    def _encode_cursor(self, key):
+        return base64.urlsafe_b64encode(key.encode()).decode()
+
+    def _decode_cursor(self, cursor):
+        try:
+            return base64.urlsafe_b64decode(cursor.encode()).decode()
+        except (ValueError, UnicodeError):
+            raise ValidationError("Invalid cursor")
+
+    def _prepare_supplier_data(self, supplier):
+        """Serialize a supplier record for API responses"""
+        return {
+            'id': supplier.id,
+            'name': supplier.name,
+            'email': supplier.email,
+            'phone': supplier.phone,
+            'address': supplier.address,
+        }
+
+    def _set_active(self, model_name, record_id, active):
+        """Archive or unarchive a record of the given model"""
+        label = 'Material' if model_name == 'material.material' else 'Supplier'
+        try:
+            record = request.env[model_name].sudo().browse(record_id)
+            if not record.exists():
+                return {
+                    'success': False,
+                    'error': f'{label} not found',
+                    'error_code': 404
+                }
+            
+            if active:
+                record.action_unarchive()
+            else:
+                record.action_archive()
+            
+            return {
+                'success': True,
+                'message': f'{label} {"unarchived" if active else "archived"} successfully',
+                'data': {
+                    'id': record.id,
+                    'active': record.active,
+                }
+            }
+            
+        except Exception as e:
+            _logger.error("Error changing active state of %s %s: %s", model_name, record_id, str(e))
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 500
+            }
@@ -1,2 +1,13 @@
+from . import autocomplete
 from . import supplier
-from . import material 
\ No newline at end of file
+from . import material
+from . import idempotency_key
+from . import material_report
+from . import catalog_snapshot
+from . import api_throttle
+from . import price_history
+from . import material_duplicate
+from . import api_key
+from . import slow_request
+from . import warmup
+from . import ir_http
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import secrets
+import time
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+
+API_SCOPES = ['materials:read', 'materials:write', 'suppliers:read', 'suppliers:write']
+KEY_PREFIX = 'mm_'
+
+
+def hash_key(key):
+    """Keys are 256 random bits, so a fast unsalted hash is enough to store them"""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ApiKey(models.Model):
+    _name = 'material.api.key'
+    _description = 'Material API Key'
+    _order = 'name'
+
+    name = fields.Char(string='Name', required=True, help="What or who uses this key")
+    user_id = fields.Many2one(
+        'res.users',
+        string='User',
+        required=True,
+        ondelete='cascade',
+        default=lambda self: self.env.user,
+        help="Requests made with this key run as this user"
+    )
+    key_prefix = fields.Char(string='Key Prefix', readonly=True, copy=False,
+                             help="First characters of the key, to recognise it")
+    key_hash = fields.Char(string='Key Hash', readonly=True, copy=False, groups='base.group_system')
+    scopes = fields.Char(
+        string='Scopes',
+        required=True,
+        default='materials:read suppliers:read',
+        help="Space separated: %s" % ' '.join(API_SCOPES)
+    )
+    active = fields.Boolean(string='Active', default=True, help="Archive the key to revoke it")
+
+    _sql_constraints = [
+        ('key_hash_unique', 'UNIQUE(key_hash)', 'API key already exists.')
+    ]
+
+    @api.constrains('scopes')
+    def _check_scopes(self):
+        """Validate scopes are known"""
+        unknown = set(' '.join(self.mapped('scopes')).split()) - set(API_SCOPES)
+        if unknown:
+            raise ValidationError("Unknown scope(s): %s. Available scopes: %s" % (
+                ', '.join(sorted(unknown)), ', '.join(API_SCOPES)))
+
+    def write(self, vals):
+        """Changed or revoked keys must stop working in every worker"""
+        res = super(ApiKey, self).write(vals)
+        self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super(ApiKey, self).unlink()
+        self.clear_caches()
+        return res
+
+    def _generate_key(self):
+        """Replace the key of each record by a new random one.
+
+        Returns the plain keys by record id; only their hash is stored, so
+        they cannot be shown again.
+        """
+        keys = {}
+        for api_key in self:
+            key = KEY_PREFIX + secrets.token_urlsafe(32)
+            api_key.write({'key_hash': hash_key(key), 'key_prefix': key[:len(KEY_PREFIX) + 6]})
+            keys[api_key.id] = key
+        return keys
+
+    def action_generate_key(self):
+        """Generate a new key and show it once.
+
+        The key only travels in the action's context to an unsaved form, so
+        it is never written to the database.
+        """
+        self.ensure_one()
+        key = self._generate_key()[self.id]
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'New API Key',
+            'res_model': 'material.api.key.reveal',
+            'views': [(False, 'form')],
+            'target': 'new',
+            'context': {'default_api_key_id': self.id, 'default_key': key},
+        }
+
+    @api.model
+    def _resolve(self, key):
+        """Return ``(key_id, user_id, scopes)`` for a valid API key, or None.
+
+        Resolutions are kept in this worker's ORM cache for
+        ``material_management.api_key_cache_ttl`` seconds (0 disables it).
+        Changing or revoking a key clears the cache of all workers through
+        the registry cache signaling that already runs on every request, so
+        authenticated requests normally run no query for their key.
+        """
+        ttl = int(self.env['ir.config_parameter'].sudo().get_param(
+            'material_management.api_key_cache_ttl', 300))
+        key_hash = hash_key(key)
+        if ttl <= 0:
+            return self._lookup_key_hash(key_hash)
+        # The period is part of the cache key, so entries expire when it changes
+        return self._lookup_key_hash_cached(key_hash, int(time.time() // ttl))
+
+    @tools.ormcache('key_hash', 'period')
+    def _lookup_key_hash_cached(self, key_hash, period):
+        return self._lookup_key_hash(key_hash)
+
+    def _lookup_key_hash(self, key_hash):
+        self._cr.execute("""
+            SELECT k.id, k.user_id, k.scopes
+            FROM material_api_key k
+            JOIN res_users u ON u.id = k.user_id
+            WHERE k.key_hash = %s AND k.active AND u.active
+        """, (key_hash,))
+        row = self._cr.fetchone()
+        return (row[0], row[1], frozenset(row[2].split())) if row else None
+
+
+class ApiKeyReveal(models.AbstractModel):
+    """Dialog showing a new key; it has no table, so the key is never stored"""
+    _name = 'material.api.key.reveal'
+    _description = 'Show New Material API Key'
+
+    # Needed by the onchange that fills the form from the context defaults
+    id = fields.Id()
+    api_key_id = fields.Many2one('material.api.key', string='API Key', readonly=True)
+    key = fields.Char(string='Key', readonly=True)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import math
+import zlib
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+# Route name -> (statement timeout in ms, max concurrent requests); 0 disables a limit
+ROUTE_LIMITS = {
+    'get_materials': (15000, 8),
+    'get_suppliers': (15000, 8),
+    'lookup_materials': (15000, 8),
+    'batch': (60000, 4),
+    'bulk_adjust_price': (120000, 2),
+    'onboard_supplier': (120000, 2),
+}
+DEFAULT_ROUTE_LIMITS = (30000, 0)
+
+
+class ApiThrottle(models.AbstractModel):
+    _name = 'material.api.throttle'
+    _description = 'API Admission Control'
+
+    def init(self):
+        """Create the token bucket table shared by all workers.
+
+        Buckets are cheap to lose, so the table is UNLOGGED to keep its hot
+        updates out of the WAL.
+        """
+        self._cr.execute("""
+            CREATE UNLOGGED TABLE IF NOT EXISTS material_api_rate_bucket (
+                client_key VARCHAR PRIMARY KEY,
+                tokens DOUBLE PRECISION NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+        """)
+
+    @api.model
+    def _get_param(self, key, default):
+        value = self.env['ir.config_parameter'].sudo().get_param('material_management.%s' % key)
+        return default if value in (None, False, '') else float(value)
+
+    @api.model
+    def _admit(self, route_name, client_key):
+        """Apply admission control for ``route_name`` to the current request.
+
+        Sets the statement timeout of the request transaction, then checks
+        the client's rate limit and the route's concurrency limit. Returns
+        None if the request may proceed, or ``(status, retry_after)`` with
+        status 429 (rate limited) or 503 (route saturated). Admitted requests
+        pay their token with ``_consume_token`` once they have run.
+        """
+        timeout, max_concurrency = ROUTE_LIMITS.get(route_name, DEFAULT_ROUTE_LIMITS)
+        timeout = int(self._get_param('throttle.%s.statement_timeout_ms' % route_name, timeout))
+        max_concurrency = int(self._get_param('throttle.%s.max_concurrency' % route_name, max_concurrency))
+
+        if timeout > 0:
+            self._cr.execute("SET LOCAL statement_timeout = %s", (timeout,))
+
+        retry_after = self._check_rate(client_key)
+        if retry_after:
+            return 429, retry_after
+
+        if max_concurrency > 0 and not self._acquire_slot(route_name, max_concurrency):
+            return 503, 1
+        return None
+
+    @api.model
+    def _rate_limit(self):
+        """Return ``(capacity, tokens per second)`` of the client rate limit, or None when disabled"""
+        capacity = self._get_param('rate_limit.capacity', 0)
+        rate = self._get_param('rate_limit.per_second', 10)
+        if capacity <= 0 or rate <= 0:
+            return None
+        return capacity, rate
+
+    @api.model
+    def _check_rate(self, client_key):
+        """Return 0 if the client's bucket holds a token, else the seconds until it does.
+
+        A plain read of the committed balance: it takes no lock, so it never
+        waits for other requests of the same client.
+        """
+        limits = self._rate_limit()
+        if not limits:
+            return 0
+        capacity, rate = limits
+        self._cr.execute("""
+            SELECT LEAST(%(capacity)s, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * %(rate)s)
+            FROM material_api_rate_bucket
+            WHERE client_key = %(key)s
+        """, {'key': client_key, 'capacity': capacity, 'rate': rate})
+        row = self._cr.fetchone()
+        if not row or row[0] >= 1:
+            return 0
+        return max(1, int(math.ceil((1 - row[0]) / rate)))
+
+    @api.model
+    def _consume_token(self, client_key, rolled_back=False):
+        """Debit one token from the client's bucket, once the request has run.
+
+        Normally the bucket is refilled and debited in one UPSERT on the
+        request cursor, inside a savepoint, so no other connection is needed
+        and the row is locked only from this statement to the commit of the
+        request. When the request transaction is aborted (cancelled by its
+        statement timeout or any other SQL error) or ``rolled_back`` because
+        the route raised, the token is charged in a short transaction of its
+        own instead, so failing requests are not free. The balance may go
+        down to ``-capacity``: concurrent requests admitted on the same
+        balance are paid back before the client is admitted again.
+        """
+        cr = self._cr
+        in_error = cr._cnx.get_transaction_status() == TRANSACTION_STATUS_INERROR
+        if not in_error and not self._rate_limit():
+            return
+        if not rolled_back and not in_error:
+            try:
+                with cr.savepoint():
+                    self._debit_token(client_key)
+                return
+            except psycopg2.Error as e:
+                _logger.info("Charging the rate limit token of %s in its own transaction: %s", client_key, e)
+        try:
+            with self.pool.cursor() as token_cr:
+                self.with_env(self.env(cr=token_cr))._debit_token(client_key)
+        except psycopg2.Error as e:
+            _logger.warning("Could not debit the rate limit bucket of %s: %s", client_key, e)
+
+    @api.model
+    def _debit_token(self, client_key):
+        limits = self._rate_limit()
+        if not limits:
+            return
+        capacity, rate = limits
+        self._cr.execute("""
+            INSERT INTO material_api_rate_bucket AS b (client_key, tokens, updated_at)
+            VALUES (%(key)s, %(capacity)s - 1, clock_timestamp())
+            ON CONFLICT (client_key) DO UPDATE SET
+                tokens = GREATEST(
+                    -%(capacity)s,
+                    LEAST(%(capacity)s, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * %(rate)s) - 1
+                ),
+                updated_at = clock_timestamp()
+        """, {'key': client_key, 'capacity': capacity, 'rate': rate})
+
+    @api.model
+    def _acquire_slot(self, route_name, max_concurrency):
+        """Take one of the route's concurrency slots for the current transaction.
+
+        Slots are transaction-level advisory locks, shared by all workers and
+        released automatically on commit or rollback. Never waits.
+        """
+        route_key = zlib.crc32(('material_api:%s' % route_name).encode()) & 0x7fffffff
+        self._cr.execute("""
+            SELECT slot FROM generate_series(1, %s) AS slot
+            WHERE pg_try_advisory_xact_lock(%s, slot)
+            LIMIT 1
+        """, (max_concurrency, route_key))
+        return bool(self._cr.fetchone())
+
+    @api.model
+    def _gc_rate_buckets(self):
+        """Drop buckets idle for an hour (called by cron); they are full again anyway"""
+        self._cr.execute("""
+            DELETE FROM material_api_rate_bucket
+            WHERE updated_at < now() - interval '1 hour'
+        """)
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+import logging
+import re
+import threading
+import time
+
+from odoo import models, api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+# Per-worker indexes keyed by (database name, model name)
+_indexes = {}
+# Last generation read from the database and when, keyed like _indexes
+_generations = {}
+_building = set()
+_building_lock = threading.Lock()
+
+_word_split = re.compile(r'\W+')
+
+
+def _normalize(value):
+    return (value or '').strip().lower()
+
+
+class PrefixIndex(object):
+    """Sorted in-memory index answering case-insensitive prefix queries.
+
+    Each record is indexed under its full texts and under every word of them,
+    so ``"den"`` matches both ``"Denim Blue"`` and ``"Stretch Denim"``. With
+    ``words=False`` only full texts match, like ``=ilike 'den%'``.
+    """
+
+    def __init__(self, generation, rows=(), disabled=False):
+        self.generation = generation
+        self.disabled = disabled
+        self.records = {}
+        entries = []
+        for record_id, sort_key, label, texts in rows:
+            self.records[record_id] = (sort_key, label)
+            for text in texts:
+                text = _normalize(text)
+                if not text:
+                    continue
+                entries.append((text, False, record_id))
+                for word in _word_split.split(text)[1:]:
+                    if word:
+                        entries.append((word, True, record_id))
+        entries.sort()
+        self.terms = [term for term, is_word, record_id in entries]
+        self.is_word = [is_word for term, is_word, record_id in entries]
+        self.ids = [record_id for term, is_word, record_id in entries]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def search(self, prefix, limit=None, words=True):
+        """Return ``(id, label)`` pairs matching ``prefix``, in record order"""
+        prefix = _normalize(prefix)
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + '\U0010ffff', start)
+        matched = {
+            self.ids[position] for position in range(start, end)
+            if words or not self.is_word[position]
+        }
+        matched = sorted(matched, key=lambda record_id: self.records[record_id][0])
+        if limit:
+            matched = matched[:limit]
+        return [(record_id, self.records[record_id][1]) for record_id in matched]
+
+
+class AutocompleteMixin(models.AbstractModel):
+    _name = 'material.autocomplete.mixin'
+    _description = 'In-memory Autocomplete Index'
+
+    # Fields whose changes invalidate the index (besides active)
+    _autocomplete_fields = []
+
+    def init(self):
+        """Create the sequence used to signal index changes across workers"""
+        super(AutocompleteMixin, self).init()
+        if not self._abstract:
+            self._cr.execute("CREATE SEQUENCE IF NOT EXISTS %s_autocomplete_seq" % self._table)
+
+    def _autocomplete_rows(self):
+        """Return ``(id, sort_key, label, texts)`` tuples for all active records"""
+        raise NotImplementedError()
+
+    @api.model
+    def _autocomplete_generation(self, max_age=0):
+        """Return the change generation of the records, read at most ``max_age`` seconds ago"""
+        key = (self._cr.dbname, self._name)
+        checked = _generations.get(key)
+        now = time.monotonic()
+        if checked and now - checked[0] < max_age:
+            return checked[1]
+        self._cr.execute("SELECT last_value, is_called FROM %s_autocomplete_seq" % self._table)
+        generation = self._cr.fetchone()
+        _generations[key] = (now, generation)
+        return generation
+
+    @api.model
+    def _autocomplete_usable(self):
+        """The index ignores record rules and archived records, so only use it when neither matters"""
+        if not self.env.context.get('active_test', True):
+            return False
+        if self.env.su:
+            return True
+        return (self.check_access_rights('read', raise_exception=False)
+                and not self.env['ir.rule']._compute_domain(self._name, 'read'))
+
+    @api.model
+    def _autocomplete_search(self, name, limit=None, words=True):
+        """Search the in-memory index.
+
+        Returns ``(id, label)`` pairs, or None when the caller must fall back
+        to SQL because the index is cold, stale, disabled or not applicable.
+        A cold or stale index is rebuilt in the background. Changes made by
+        other workers are noticed within ``autocomplete_check_interval``
+        seconds, so most keystrokes need no database round trip.
+        """
+        if not self._autocomplete_usable():
+            return None
+        index = _indexes.get((self._cr.dbname, self._name))
+        max_age = float(self.env['ir.config_parameter'].sudo().get_param(
+            'material_management.autocomplete_check_interval', 2))
+        if index is None or index.generation != self._autocomplete_generation(max_age):
+            self._autocomplete_schedule_build()
+            return None
+        if index.disabled:
+            return None
+        return index.search(name, limit, words=words)
+
+    @api.model
+    def _autocomplete_sql_search(self, name, limit=None):
+        """SQL equivalent of ``_autocomplete_search``, used while the index is cold.
+
+        Matches the same records: a full text or any word of it starting
+        with ``name``, ignoring case, in the same order.
+        """
+        prefix = _normalize(name)
+        like = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        word = '\\W' + re.escape(prefix)
+        query = self._where_calc([])
+        self._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_params = query.get_sql()
+        conditions, params = [], []
+        for field in self._autocomplete_fields:
+            conditions.append('"{table}"."{field}" ILIKE %s OR "{table}"."{field}" ~* %s'.format(
+                table=self._table, field=field))
+            params += [like, word]
+        self._cr.execute("""
+            SELECT "{table}".id FROM {from_clause}
+            WHERE {where_clause} AND ({conditions})
+            ORDER BY "{table}"."{sort_field}", "{table}".id
+            {limit}
+        """.format(table=self._table, from_clause=from_clause, where_clause=where_clause or 'TRUE',
+                   conditions=' OR '.join(conditions), sort_field=self._autocomplete_fields[0],
+                   limit='LIMIT %d' % int(limit) if limit else ''),
+            where_params + params)
+        return self.browse([row[0] for row in self._cr.fetchall()]).name_get()
+
+    @api.model
+    def _autocomplete_name_search(self, name, operator, args, limit):
+        """Answer ``name_search`` from the index when it has the same semantics.
+
+        Only plain prefix searches (``=ilike`` with ``name%``) qualify: the
+        index matches prefixes of full texts, whereas ``ilike`` matches
+        substrings. Returns None when the caller must search with SQL.
+        """
+        if operator != '=ilike' or args or not name or not name.endswith('%'):
+            return None
+        prefix = name[:-1]
+        if not prefix or any(char in prefix for char in '%_\\'):
+            return None
+        return self._autocomplete_search(prefix, limit, words=False)
+
+    @api.model
+    def _autocomplete_build(self):
+        """(Re)build this worker's index from the database"""
+        start = time.time()
+        # Read the generation first: a change committed while we load rows
+        # bumps it again and triggers another rebuild
+        generation = self._autocomplete_generation()
+        max_entries = int(self.env['ir.config_parameter'].sudo().get_param(
+            'material_management.autocomplete_max_records', 200000))
+        self._cr.execute("SELECT COUNT(*) FROM %s WHERE active" % self._table)
+        if self._cr.fetchone()[0] > max_entries:
+            index = PrefixIndex(generation, disabled=True)
+            _logger.info("Autocomplete index for %s disabled: more than %s records", self._name, max_entries)
+        else:
+            index = PrefixIndex(generation, self._autocomplete_rows())
+            _logger.info("Autocomplete index for %s built: %s terms in %.1f ms",
+                         self._name, len(index), (time.time() - start) * 1000)
+        _indexes[(self._cr.dbname, self._name)] = index
+        return index
+
+    @api.model
+    def _autocomplete_schedule_build(self):
+        if getattr(threading.current_thread(), 'testing', False):
+            # Tests run inside a single test cursor: build synchronously
+            self._autocomplete_build()
+            return
+
+        key = (self._cr.dbname, self._name)
+        with _building_lock:
+            if key in _building:
+                return
+            _building.add(key)
+
+        registry, model_name = self.pool, self._name
+
+        def build():
+            try:
+                with api.Environment.manage(), registry.cursor() as cr:
+                    api.Environment(cr, SUPERUSER_ID, {})[model_name]._autocomplete_build()
+            except Exception:
+                _logger.exception("Failed to build autocomplete index for %s", model_name)
+            finally:
+                with _building_lock:
+                    _building.discard(key)
+
+        threading.Thread(target=build, name='autocomplete-%s' % model_name, daemon=True).start()
+
+    def _autocomplete_invalidate(self):
+        """Drop this worker's index now and signal the other workers after commit"""
+        _indexes.pop((self._cr.dbname, self._name), None)
+
+        flag = 'autocomplete_signal_%s' % self._table
+        if self._cr.postcommit.data.get(flag):
+            return
+        self._cr.postcommit.data[flag] = True
+        registry, table = self.pool, self._table
+
+        @self._cr.postcommit.add
+        def signal_change():
+            with registry.cursor() as cr:
+                cr.execute("SELECT nextval('%s_autocomplete_seq')" % table)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(AutocompleteMixin, self).create(vals_list)
+        records._autocomplete_invalidate()
+        return records
+
+    def write(self, vals):
+        res = super(AutocompleteMixin, self).write(vals)
+        if set(vals) & set(self._autocomplete_fields + ['active']):
+            self._autocomplete_invalidate()
+        return res
+
+    def unlink(self):
+        self._autocomplete_invalidate()
+        return super(AutocompleteMixin, self).unlink()
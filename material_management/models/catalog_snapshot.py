@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from odoo import models, api, tools
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+SNAPSHOT_DIR = 'material_snapshots'
+MANIFEST_NAME = 'latest.json'
+FETCH_SIZE = 10000
+
+# Catalog name -> (query, column names); only active records are exported
+CATALOGS = {
+    'materials': ("""
+        SELECT m.id, m.material_code, m.material_name, m.material_type, m.material_buy_price,
+               m.supplier_id, s.name, m.version
+        FROM material_material m
+        JOIN material_supplier s ON s.id = m.supplier_id
+        WHERE m.active
+        ORDER BY m.id
+    """, ['id', 'material_code', 'material_name', 'material_type', 'material_buy_price',
+          'supplier_id', 'supplier_name', 'version']),
+    'suppliers': ("""
+        SELECT id, name, email, phone, address
+        FROM material_supplier
+        WHERE active
+        ORDER BY id
+    """, ['id', 'name', 'email', 'phone', 'address']),
+}
+
+
+def snapshot_dir(dbname):
+    return os.path.join(tools.config.filestore(dbname), SNAPSHOT_DIR)
+
+
+def read_manifest(dbname):
+    """Return the manifest of the latest snapshots, or an empty dict"""
+    try:
+        with open(os.path.join(snapshot_dir(dbname), MANIFEST_NAME)) as manifest:
+            return json.load(manifest)
+    except (IOError, ValueError):
+        return {}
+
+
+def _write_atomic(path, content):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as tmp:
+        tmp.write(content)
+    os.replace(tmp_path, path)
+
+
+class CatalogSnapshot(models.AbstractModel):
+    _name = 'material.catalog.snapshot'
+    _description = 'Material Catalog Snapshot'
+
+    @api.model
+    def generate_snapshots(self):
+        """Write a new snapshot of every catalog whose content changed (called by cron).
+
+        Files are written next to the filestore as gzipped JSON, plus Parquet
+        when pyarrow is installed, and published by atomically replacing the
+        manifest so readers never see a partially written snapshot.
+        """
+        directory = snapshot_dir(self._cr.dbname)
+        os.makedirs(directory, exist_ok=True)
+        manifest = read_manifest(self._cr.dbname)
+        keep = int(self.env['ir.config_parameter'].sudo().get_param(
+            'material_management.snapshot_keep', 5))
+
+        for catalog in CATALOGS:
+            start = time.time()
+            entry = self._write_snapshot(catalog, directory, manifest.get(catalog))
+            if entry:
+                manifest[catalog] = entry
+                _write_atomic(os.path.join(directory, MANIFEST_NAME), json.dumps(manifest))
+                _logger.info("Wrote %s snapshot %s (%s records) in %.1f s",
+                             catalog, entry['version'], entry['count'], time.time() - start)
+            self._purge_old_snapshots(directory, catalog, manifest.get(catalog), keep)
+        return manifest
+
+    def _write_snapshot(self, catalog, directory, current):
+        """Export ``catalog``; return its manifest entry, or None if unchanged"""
+        query, columns = CATALOGS[catalog]
+        self._cr.execute(query)
+
+        digest = hashlib.sha256()
+        count = 0
+        column_data = {column: [] for column in columns} if pyarrow else None
+        fd, json_tmp = tempfile.mkstemp(dir=directory, suffix='.json.gz')
+        os.close(fd)
+        try:
+            with gzip.open(json_tmp, 'wt', encoding='utf-8') as out:
+                out.write('[')
+                while True:
+                    rows = self._cr.fetchmany(FETCH_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        line = json.dumps(dict(zip(columns, row)), sort_keys=True)
+                        digest.update(line.encode())
+                        out.write((',\n' if count else '\n') + line)
+                        count += 1
+                        if column_data is not None:
+                            for column, value in zip(columns, row):
+                                column_data[column].append(value)
+                out.write('\n]\n')
+
+            version = digest.hexdigest()[:16]
+            if current and current.get('version') == version:
+                return None
+
+            prefix = '%s-%s-%s' % (catalog, time.strftime('%Y%m%d%H%M%S', time.gmtime()), version)
+            files = {'json.gz': prefix + '.json.gz'}
+            os.replace(json_tmp, os.path.join(directory, files['json.gz']))
+            json_tmp = None
+
+            if column_data is not None:
+                files['parquet'] = prefix + '.parquet'
+                table = pyarrow.table(column_data)
+                parquet_tmp = os.path.join(directory, files['parquet'] + '.tmp')
+                pyarrow.parquet.write_table(table, parquet_tmp)
+                os.replace(parquet_tmp, os.path.join(directory, files['parquet']))
+
+            return {
+                'version': version,
+                'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'count': count,
+                'files': files,
+            }
+        finally:
+            if json_tmp and os.path.exists(json_tmp):
+                os.unlink(json_tmp)
+
+    def _purge_old_snapshots(self, directory, catalog, current, keep):
+        """Delete all but the ``keep`` most recent snapshot files of ``catalog``"""
+        current_files = set((current or {}).get('files', {}).values())
+        for extension in ('.json.gz', '.parquet'):
+            names = sorted(
+                name for name in os.listdir(directory)
+                if name.startswith(catalog + '-') and name.endswith(extension)
+            )
+            for name in names[:-keep] if keep > 0 else []:
+                if name not in current_files:
+                    os.unlink(os.path.join(directory, name))
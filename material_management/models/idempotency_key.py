@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class IdempotencyKey(models.Model):
+    _name = 'material.idempotency.key'
+    _description = 'API Idempotency Key'
+    _order = 'id desc'
+
+    key = fields.Char(
+        string='Key',
+        required=True,
+        help="Client supplied Idempotency-Key header value"
+    )
+    endpoint = fields.Char(
+        string='Endpoint',
+        required=True,
+        help="HTTP method and path the key was used on"
+    )
+    client = fields.Char(
+        string='Client',
+        required=True,
+        help="API key or user that sent the key; clients choosing the same key do not share responses"
+    )
+    request_hash = fields.Char(
+        string='Request Hash',
+        required=True,
+        help="SHA-256 of the request payload, used to reject key reuse with a different payload"
+    )
+    response = fields.Text(
+        string='Response',
+        help="Stored JSON response replayed on retries"
+    )
+    expires_at = fields.Datetime(
+        string='Expires At',
+        required=True,
+        index=True,
+        help="After this date the key is purged and can be reused"
+    )
+
+    _sql_constraints = [
+        ('key_endpoint_client_unique', 'UNIQUE(key, endpoint, client)',
+         'Idempotency key already used for this endpoint.')
+    ]
+
+    @api.model
+    def _hash_request(self, data):
+        """Return a stable hash of a request payload"""
+        payload = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @api.model
+    def _get_ttl(self):
+        hours = self.env['ir.config_parameter'].sudo().get_param(
+            'material_management.idempotency_ttl_hours', 24)
+        return timedelta(hours=float(hours))
+
+    @api.model
+    def _reserve(self, key, endpoint, client, request_hash):
+        """Reserve ``key`` for ``endpoint`` and ``client``.
+
+        Returns ``(record, created)``. The INSERT takes the unique index lock,
+        so a concurrent retry with the same key waits until the first attempt
+        commits or rolls back instead of executing the write a second time.
+        If the first attempt commits meanwhile, the REPEATABLE READ
+        transaction cannot see its row and the INSERT raises a serialization
+        failure; the caller must answer with a retry. The record is empty
+        when the conflicting row disappeared before it could be read.
+        """
+        now = fields.Datetime.now()
+        query = """
+            INSERT INTO material_idempotency_key
+                (key, endpoint, client, request_hash, expires_at, create_uid, create_date, write_uid, write_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (key, endpoint, client) DO NOTHING
+            RETURNING id
+        """
+        params = (key, endpoint, client, request_hash, now + self._get_ttl(), self.env.uid, now, self.env.uid, now)
+        self.env.cr.execute(query, params)
+        row = self.env.cr.fetchone()
+        if row:
+            return self.browse(row[0]), True
+        
+        self.env.cr.execute("""
+            SELECT id, expires_at FROM material_idempotency_key
+            WHERE key = %s AND endpoint = %s AND client = %s
+        """, (key, endpoint, client))
+        row = self.env.cr.fetchone()
+        if not row:
+            return self.browse(), False
+        existing_id, expires_at = row
+        if expires_at > now:
+            return self.browse(existing_id), False
+        
+        # Expired but not purged yet by the cron: start over with a fresh key
+        self.env.cr.execute("DELETE FROM material_idempotency_key WHERE id = %s", (existing_id,))
+        self.invalidate_cache(ids=[existing_id])
+        self.env.cr.execute(query, params)
+        row = self.env.cr.fetchone()
+        return (self.browse(row[0]), True) if row else (self.browse(), False)
+
+    def _store_response(self, response):
+        self.ensure_one()
+        self.env.cr.execute(
+            "UPDATE material_idempotency_key SET response = %s WHERE id = %s",
+            (json.dumps(response), self.id)
+        )
+        self.invalidate_cache(['response'], self.ids)
+
+    def _get_response(self):
+        self.ensure_one()
+        return json.loads(self.response) if self.response else {
+            'success': False,
+            'error': 'A request with this Idempotency-Key is still being processed',
+            'error_code': 409
+        }
+
+    @api.model
+    def _gc_expired_keys(self):
+        """Purge expired idempotency keys (called by cron)"""
+        self.env.cr.execute(
+            "DELETE FROM material_idempotency_key WHERE expires_at < %s",
+            (fields.Datetime.now(),)
+        )
+        _logger.info("Purged %s expired idempotency keys", self.env.cr.rowcount)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+from odoo.http import request
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = 'ir.http'
+
+    @classmethod
+    def _dispatch(cls):
+        """Apply the HTTP status set by a material API route to its JSON-RPC response.
+
+        JSON-RPC responses are always HTTP 200. A route that must answer with
+        another status (e.g. 429 when throttled) sets
+        ``request.material_response_status`` to ``(status, headers)``.
+        """
+        response = super(IrHttp, cls)._dispatch()
+        override = getattr(request, 'material_response_status', None)
+        if override and hasattr(response, 'status_code'):
+            status, headers = override
+            response.status_code = status
+            for name, value in headers.items():
+                response.headers[name] = value
+        return response
@@ -1,11 +1,32 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
+# Default prefixes of generated material codes, overridable with the
+# material_management.code_prefix.<material_type> system parameters
+MATERIAL_CODE_PREFIXES = {
+    'fabric': 'FAB',
+    'jeans': 'JNS',
+    'cotton': 'CTN',
+}
+
+# Stored fields accepted by Material._bulk_create
+BULK_CREATE_FIELDS = [
+    'material_code',
+    'material_name',
+    'material_type',
+    'material_buy_price',
+    'supplier_id',
+    'active',
+]
+
 
 class Material(models.Model):
     _name = 'material.material'
+    _inherit = ['material.autocomplete.mixin']
     _description = 'Material'
     _order = 'material_code'
     _rec_name = 'material_name'
@@ -42,41 +63,348 @@ class Material(models.Model):
         required=True,
         help="Related supplier for this material"
     )
+    active = fields.Boolean(
+        string='Active',
+        default=True,
+        help="Uncheck to archive the material without deleting it"
+    )
+    version = fields.Integer(
+        string='Version',
+        default=1,
+        readonly=True,
+        copy=False,
+        help="Incremented on every write, used for optimistic concurrency control"
+    )
+
+    _autocomplete_fields = ['material_code', 'material_name']
 
     # SQL constraints
+    # material_code_unique deliberately spans archived rows too, so a retired
+    # code can never be silently reused by a new material
     _sql_constraints = [
         ('material_code_unique', 'UNIQUE(material_code)', 'Material code already exists. Please use a unique material code.'),
         ('material_buy_price_positive', 'CHECK(material_buy_price >= 100)', 'Material buy price must be at least 100. Please enter a valid price (≥ 100).')
     ]
 
+    def init(self):
+        """Create partial indexes covering only active materials.
+
+        List/search queries always filter on ``active`` (via ``active_test``),
+        so indexing only live rows keeps their size and cost proportional to
+        the live catalog instead of the full history.
+        """
+        super(Material, self).init()
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_material_active_type_code_idx
+            ON material_material (material_type, material_code) WHERE active
+        """)
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_material_active_supplier_idx
+            ON material_material (supplier_id) WHERE active
+        """)
+        # Shared by all material types; the prefix tells the codes apart
+        self._cr.execute("CREATE SEQUENCE IF NOT EXISTS material_material_code_seq")
+
+    # Constraints are checked on the whole written recordset at once: field
+    # values come from one prefetch and each check runs a constant number of
+    # queries, so validating a 10k-row create costs the same per row as one.
+
     @api.constrains('material_buy_price')
     def _check_material_buy_price(self):
         """Validate that material buy price is not less than 100"""
-        for record in self:
-            if record.material_buy_price < 100:
-                raise ValidationError("Material buy price must be at least 100. Please enter a valid price (≥ 100).")
+        if any(price < 100 for price in self.mapped('material_buy_price')):
+            raise ValidationError("Material buy price must be at least 100. Please enter a valid price (≥ 100).")
 
     @api.constrains('material_code')
     def _check_material_code(self):
         """Validate material code is not empty and has minimum length"""
-        for record in self:
-            if not record.material_code or len(record.material_code.strip()) < 2:
-                raise ValidationError("Material code must be at least 2 characters long. Please provide a valid material code.")
+        if any(not code or len(code.strip()) < 2 for code in self.mapped('material_code')):
+            raise ValidationError("Material code must be at least 2 characters long. Please provide a valid material code.")
 
     @api.constrains('material_type')
     def _check_material_type(self):
         """Validate material type is one of the allowed values"""
-        valid_types = ['fabric', 'jeans', 'cotton']
-        for record in self:
-            if record.material_type not in valid_types:
-                raise ValidationError(f"Invalid material type '{record.material_type}'. Please select from: fabric, jeans, or cotton.")
+        valid_types = {'fabric', 'jeans', 'cotton'}
+        invalid_types = set(self.mapped('material_type')) - valid_types
+        if invalid_types:
+            raise ValidationError(f"Invalid material type '{invalid_types.pop()}'. Please select from: fabric, jeans, or cotton.")
 
     @api.constrains('supplier_id')
     def _check_supplier_id(self):
-        """Validate supplier exists"""
-        for record in self:
-            if not record.supplier_id or not record.supplier_id.exists():
-                raise ValidationError("Invalid supplier selected. Please choose a valid supplier.")
+        """Validate supplier exists, with one existence query for all distinct suppliers"""
+        if any(not record.supplier_id for record in self):
+            raise ValidationError("Invalid supplier selected. Please choose a valid supplier.")
+        suppliers = self.mapped('supplier_id')
+        if len(suppliers.exists()) != len(suppliers):
+            raise ValidationError("Invalid supplier selected. Please choose a valid supplier.")
+
+    @api.model
+    def _allocate_material_codes(self, material_type, count):
+        """Return ``count`` new codes for ``material_type`` in one sequence round trip.
+
+        Sequence values are never handed out twice, so concurrent creates
+        cannot collide on generated codes; rolled back values leave gaps.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        prefix = ICP.get_param('material_management.code_prefix.%s' % material_type) \
+            or MATERIAL_CODE_PREFIXES.get(material_type) or material_type[:3].upper()
+        padding = int(ICP.get_param('material_management.code_padding', 6))
+        self._cr.execute("SELECT nextval('material_material_code_seq') FROM generate_series(1, %s)", (count,))
+        return ['%s%0*d' % (prefix, padding, row[0]) for row in self._cr.fetchall()]
+
+    @api.model
+    def _fill_material_codes(self, vals_list):
+        """Return copies of ``vals_list`` with missing codes allocated per material type"""
+        vals_list = [dict(vals) for vals in vals_list]
+        missing_codes = defaultdict(list)
+        for vals in vals_list:
+            if not vals.get('material_code') and vals.get('material_type'):
+                missing_codes[vals['material_type']].append(vals)
+        for material_type, type_vals_list in missing_codes.items():
+            codes = self._allocate_material_codes(material_type, len(type_vals_list))
+            for vals, code in zip(type_vals_list, codes):
+                vals['material_code'] = code
+        return vals_list
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Generate missing material codes and record the initial price in the price history"""
+        vals_list = self._fill_material_codes(vals_list)
+        materials = super(Material, self).create(vals_list)
+        self.env['material.price.history']._record([
+            (material.id, material.supplier_id.id, material.material_buy_price, None)
+            for material in materials
+        ])
+        return materials
+
+    @api.model
+    def _bulk_create(self, vals_list):
+        """Create materials with one multi-row INSERT instead of one per record.
+
+        Meant for large imports such as supplier onboarding: only the stored
+        fields in ``BULK_CREATE_FIELDS`` are accepted, and the rows and their
+        initial price history are written in a single statement. Constraints
+        are then checked on the whole recordset, as ``create`` would.
+        """
+        self.check_access_rights('create')
+        if not vals_list:
+            return self.browse()
+        unknown_fields = set().union(*vals_list) - set(BULK_CREATE_FIELDS) - {'version'}
+        if unknown_fields:
+            raise ValidationError("Unknown material fields: %s" % ", ".join(sorted(unknown_fields)))
+        
+        vals_list = self._fill_material_codes(vals_list)
+        try:
+            prices = [float(vals['material_buy_price']) for vals in vals_list]
+            suppliers = [int(vals['supplier_id']) for vals in vals_list]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError("Material buy price and supplier must be numbers.")
+        
+        self._cr.execute("""
+            WITH inserted AS (
+                INSERT INTO material_material (material_code, material_name, material_type, material_buy_price,
+                                               supplier_id, active, version,
+                                               create_uid, create_date, write_uid, write_date)
+                SELECT v.material_code, v.material_name, v.material_type, v.material_buy_price,
+                       v.supplier_id, v.active, 1,
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                FROM unnest(%(codes)s::varchar[], %(names)s::varchar[], %(types)s::varchar[],
+                            %(prices)s::float8[], %(suppliers)s::int[], %(actives)s::bool[])
+                     WITH ORDINALITY AS v(material_code, material_name, material_type, material_buy_price,
+                                          supplier_id, active, position)
+                ORDER BY v.position
+                RETURNING id, supplier_id, material_buy_price
+            ), history AS (
+                INSERT INTO material_price_history (material_id, supplier_id, price, changed_at, user_id)
+                SELECT id, supplier_id, material_buy_price, clock_timestamp() at time zone 'UTC', %(uid)s
+                FROM inserted
+            )
+            SELECT id FROM inserted ORDER BY id
+        """, {
+            'uid': self.env.uid,
+            'codes': [vals.get('material_code') for vals in vals_list],
+            'names': [vals.get('material_name') for vals in vals_list],
+            'types': [vals.get('material_type') for vals in vals_list],
+            'prices': prices,
+            'suppliers': suppliers,
+            'actives': [bool(vals.get('active', True)) for vals in vals_list],
+        })
+        # Ids come from one sequence in insertion order, so they follow vals_list
+        materials = self.browse([row[0] for row in self._cr.fetchall()])
+        
+        materials._validate_fields(['material_code', 'material_type', 'material_buy_price', 'supplier_id'])
+        materials.check_access_rule('create')
+        materials._autocomplete_invalidate()
+        return materials
+
+    def write(self, vals):
+        """Bump the version of written materials and record price changes"""
+        if 'version' in vals:
+            vals = {key: value for key, value in vals.items() if key != 'version'}
+        previous_prices = {}
+        if 'material_buy_price' in vals:
+            previous_prices = {material.id: material.material_buy_price for material in self}
+        res = super(Material, self).write(vals)
+        if previous_prices:
+            self.env['material.price.history']._record([
+                (material.id, material.supplier_id.id, material.material_buy_price, previous_prices[material.id])
+                for material in self
+                if material.material_buy_price != previous_prices[material.id]
+            ])
+        if self.ids and not self.env.context.get('material_version_bumped'):
+            self._cr.execute(
+                "UPDATE material_material SET version = version + 1 WHERE id IN %s",
+                (tuple(self.ids),)
+            )
+            self.invalidate_cache(['version'], self.ids)
+        return res
+
+    def unlink(self):
+        """Delete the price history of the deleted materials"""
+        material_ids = self.ids
+        res = super(Material, self).unlink()
+        self.env['material.price.history']._delete_material_history(material_ids)
+        return res
+
+    def write_if_version(self, expected_version, vals):
+        """Write ``vals`` only if the material is still at ``expected_version``.
+
+        The version check and bump happen in a single UPDATE, which also locks
+        the row until commit, so concurrent writers need no prior SELECT or
+        explicit lock. Returns False when the version no longer matches.
+        The bump and the write share a savepoint, so a write rejected by a
+        constraint also rolls back the bump.
+        """
+        self.ensure_one()
+        with self._cr.savepoint():
+            self._cr.execute("""
+                UPDATE material_material SET version = version + 1
+                WHERE id = %s AND version = %s
+                RETURNING id
+            """, (self.id, expected_version))
+            matched = self._cr.fetchone()
+            self.invalidate_cache(['version'], self.ids)
+            if not matched:
+                return False
+            self.with_context(material_version_bumped=True).write(vals)
+        return True
+
+    @api.model
+    def bulk_adjust_price(self, domain, percent=None, amount=None, dry_run=False):
+        """Adjust the buy price of all materials matching ``domain`` in one UPDATE.
+
+        Exactly one of ``percent`` (e.g. ``10`` for +10%) or ``amount`` (added
+        to the price) must be given. Rows whose new price would fall below 100
+        are reported; if there are any, nothing is written. With ``dry_run``
+        only the matched count and violations are computed.
+
+        Otherwise the matched rows are locked before the violation check, so
+        the check and the UPDATE see the same prices. A concurrent change of
+        one of them raises a serialization failure, since the request
+        transaction runs under REPEATABLE READ.
+        """
+        if (percent is None) == (amount is None):
+            raise ValidationError("Provide either a percent or an amount price adjustment.")
+        
+        if percent is not None:
+            new_price = "ROUND((material_material.material_buy_price * (1 + %s / 100.0))::numeric, 2)::float8"
+            adjustment = float(percent)
+        else:
+            new_price = "ROUND((material_material.material_buy_price + %s)::numeric, 2)::float8"
+            adjustment = float(amount)
+        
+        self.check_access_rights('write')
+        self.flush(['material_buy_price'])
+        query = self._where_calc(domain)
+        self._apply_ir_rules(query, 'write')
+        from_clause, where_clause, where_params = query.get_sql()
+        where_clause = where_clause or 'TRUE'
+        
+        self._cr.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT material_material.id FROM {from_clause} WHERE {where_clause}
+                {lock}
+            ) matched
+        """.format(from_clause=from_clause, where_clause=where_clause,
+                   lock='' if dry_run else 'FOR UPDATE OF material_material'), where_params)
+        matched = self._cr.fetchone()[0]
+        
+        self._cr.execute("""
+            SELECT material_material.id, material_material.material_code,
+                   material_material.material_buy_price, {new_price}
+            FROM {from_clause}
+            WHERE {where_clause} AND {new_price} < 100
+            ORDER BY material_material.material_code
+        """.format(new_price=new_price, from_clause=from_clause, where_clause=where_clause),
+            [adjustment] + where_params + [adjustment])
+        violations = [{
+            'id': row[0],
+            'material_code': row[1],
+            'material_buy_price': row[2],
+            'new_price': row[3],
+        } for row in self._cr.fetchall()]
+        
+        result = {
+            'matched': matched,
+            'updated': 0,
+            'violations': violations,
+            'dry_run': bool(dry_run),
+        }
+        if dry_run or violations or not matched:
+            return result
+        
+        # Update and append the price history in one statement
+        self._cr.execute("""
+            WITH previous AS (
+                SELECT material_material.id, material_material.material_buy_price AS previous_price
+                FROM {from_clause}
+                WHERE {where_clause}
+            ), updated AS (
+                UPDATE material_material
+                SET material_buy_price = {new_price},
+                    version = version + 1,
+                    write_uid = %s,
+                    write_date = (now() at time zone 'UTC')
+                FROM previous
+                WHERE material_material.id = previous.id
+                RETURNING material_material.id, material_material.supplier_id,
+                          material_material.material_buy_price, previous.previous_price
+            ), history AS (
+                INSERT INTO material_price_history (material_id, supplier_id, price, previous_price, changed_at, user_id)
+                SELECT id, supplier_id, material_buy_price, previous_price, clock_timestamp() at time zone 'UTC', %s
+                FROM updated
+                WHERE material_buy_price <> previous_price
+            )
+            SELECT id FROM updated
+        """.format(new_price=new_price, from_clause=from_clause, where_clause=where_clause),
+            where_params + [adjustment, self.env.uid, self.env.uid])
+        updated_ids = [row[0] for row in self._cr.fetchall()]
+        
+        # The UPDATE bypassed the ORM: drop cached values of the touched rows
+        self.invalidate_cache(['material_buy_price', 'version', 'write_uid', 'write_date'], updated_ids)
+        result['updated'] = len(updated_ids)
+        return result
+
+    @api.model
+    def _lookup(self, key_field, keys, include_archived=False):
+        """Resolve materials by ``id`` or ``material_code`` in one indexed query.
+
+        Returns a dict mapping each found key to its material record.
+        """
+        if key_field not in ('id', 'material_code'):
+            raise ValueError("Unsupported lookup field: %s" % key_field)
+        if not keys:
+            return {}
+        self.flush([key_field, 'active'])
+        query = "SELECT id, {field} FROM material_material WHERE {field} = ANY(%s)".format(field=key_field)
+        if not include_archived:
+            query += " AND active"
+        self._cr.execute(query, (list(keys),))
+        rows = self._cr.fetchall()
+        
+        # Browse all at once so serialization shares one prefetch batch
+        materials = self.browse([row[0] for row in rows])
+        return {key: material for material, (material_id, key) in zip(materials, rows)}
 
     def name_get(self):
         """Override name_get to show material code and name"""
@@ -86,9 +414,23 @@ class Material(models.Model):
             result.append((record.id, name))
         return result
 
+    def _autocomplete_rows(self):
+        self._cr.execute("SELECT id, material_code, material_name FROM material_material WHERE active")
+        return [
+            (material_id, (code, material_id), '[%s] %s' % (code, name), (code, name))
+            for material_id, code, name in self._cr.fetchall()
+        ]
+
     @api.model
     def name_search(self, name='', args=None, operator='ilike', limit=100):
-        """Override name_search to search by code and name"""
+        """Override name_search to search by code and name.
+
+        Unfiltered prefix searches (``=ilike`` with ``name%``) are answered
+        from the in-memory prefix index when it is warm.
+        """
+        result = self._autocomplete_name_search(name, operator, args, limit)
+        if result is not None:
+            return result
         args = args or []
         if name:
             domain = ['|', ('material_code', operator, name), ('material_name', operator, name)]
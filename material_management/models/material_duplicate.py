@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+import psycopg2
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Weights of the name and code similarities in a candidate's score
+NAME_WEIGHT = 0.7
+CODE_WEIGHT = 0.3
+
+
+class MaterialDuplicateRun(models.Model):
+    _name = 'material.duplicate.run'
+    _description = 'Material Duplicate Detection Run'
+    _order = 'date_start desc'
+    _rec_name = 'date_start'
+
+    date_start = fields.Datetime(string='Started', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True, digits=(16, 2))
+    material_count = fields.Integer(string='Materials', readonly=True)
+    block_count = fields.Integer(string='Blocks', readonly=True,
+                                 help="Supplier/type groups with at least two materials")
+    largest_block = fields.Integer(string='Largest Block', readonly=True)
+    candidate_count = fields.Integer(string='Candidates', readonly=True)
+    name_threshold = fields.Float(string='Name Threshold', readonly=True)
+    min_score = fields.Float(string='Minimum Score', readonly=True)
+
+
+class MaterialDuplicateCandidate(models.Model):
+    _name = 'material.duplicate.candidate'
+    _description = 'Material Duplicate Candidate'
+    _order = 'score desc, id'
+    _rec_name = 'material_id'
+
+    material_id = fields.Many2one('material.material', string='Material', required=True,
+                                  readonly=True, ondelete='cascade', index=True)
+    duplicate_id = fields.Many2one('material.material', string='Possible Duplicate', required=True,
+                                   readonly=True, ondelete='cascade', index=True)
+    supplier_id = fields.Many2one('material.supplier', string='Supplier', readonly=True)
+    material_type = fields.Selection(
+        [
+            ('fabric', 'Fabric'),
+            ('jeans', 'Jeans'),
+            ('cotton', 'Cotton'),
+        ],
+        string='Material Type',
+        readonly=True
+    )
+    name_score = fields.Float(string='Name Similarity', readonly=True, digits=(16, 3))
+    code_score = fields.Float(string='Code Similarity', readonly=True, digits=(16, 3))
+    score = fields.Float(string='Score', readonly=True, digits=(16, 3))
+    state = fields.Selection(
+        [
+            ('pending', 'To Review'),
+            ('merged', 'Duplicate Archived'),
+            ('dismissed', 'Not a Duplicate'),
+        ],
+        string='Status',
+        default='pending',
+        required=True,
+        index=True
+    )
+    run_id = fields.Many2one('material.duplicate.run', string='Detected By', readonly=True, ondelete='set null')
+
+    # Pairs are stored once, lowest material id first
+    _sql_constraints = [
+        ('material_pair_unique', 'UNIQUE(material_id, duplicate_id)', 'This pair of materials is already a candidate.'),
+        ('material_pair_ordered', 'CHECK(material_id < duplicate_id)', 'The material must have a lower ID than its duplicate.')
+    ]
+
+    def init(self):
+        """Enable pg_trgm and index active material names by trigrams.
+
+        Creating the extension needs sufficient database privileges; without
+        it the detection job refuses to run instead of failing the install.
+        """
+        try:
+            with self._cr.savepoint():
+                self._cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                self._cr.execute("""
+                    CREATE INDEX IF NOT EXISTS material_material_active_name_trgm_idx
+                    ON material_material USING gin (material_name gin_trgm_ops) WHERE active
+                """)
+        except psycopg2.Error as e:
+            _logger.warning("pg_trgm is not available, duplicate detection is disabled: %s", e)
+
+    @api.model
+    def _get_param(self, key, default):
+        value = self.env['ir.config_parameter'].sudo().get_param('material_management.%s' % key)
+        return default if value in (None, False, '') else float(value)
+
+    @api.model
+    def detect_duplicates(self):
+        """Find likely duplicate active materials (called by cron).
+
+        Materials are only compared within their block (same supplier and
+        material type). Inside a block, the trigram index on material_name
+        returns the pairs whose names are at least ``duplicate_name_threshold``
+        similar, so large blocks are not compared pairwise either. Pairs are
+        then scored on name and code similarity and upserted as candidates;
+        reviewed candidates keep their status, pending ones no longer found
+        are dropped. Returns the run record holding the runtime statistics.
+        """
+        self._cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if not self._cr.fetchone():
+            raise UserError("Duplicate detection requires the PostgreSQL extension pg_trgm.")
+
+        start = time.time()
+        name_threshold = self._get_param('duplicate_name_threshold', 0.5)
+        min_score = self._get_param('duplicate_min_score', 0.6)
+        run = self.env['material.duplicate.run'].create({
+            'date_start': fields.Datetime.now(),
+            'name_threshold': name_threshold,
+            'min_score': min_score,
+        })
+        self._cr.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(name_threshold),))
+
+        self._cr.execute("""
+            SELECT supplier_id, material_type, COUNT(*)
+            FROM material_material
+            WHERE active
+            GROUP BY supplier_id, material_type
+        """)
+        blocks = self._cr.fetchall()
+        material_count = sum(count for supplier_id, material_type, count in blocks)
+        blocks = [block for block in blocks if block[2] > 1]
+
+        for supplier_id, material_type, count in blocks:
+            self._cr.execute("""
+                INSERT INTO material_duplicate_candidate (
+                    material_id, duplicate_id, supplier_id, material_type,
+                    name_score, code_score, score, state, run_id,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT material_id, duplicate_id, %(supplier)s, %(type)s,
+                       name_score, code_score, score, 'pending', %(run)s,
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                FROM (
+                    SELECT a.id AS material_id, b.id AS duplicate_id,
+                           similarity(a.material_name, b.material_name) AS name_score,
+                           similarity(a.material_code, b.material_code) AS code_score,
+                           %(name_weight)s * similarity(a.material_name, b.material_name)
+                           + %(code_weight)s * similarity(a.material_code, b.material_code) AS score
+                    FROM material_material a
+                    JOIN material_material b
+                        ON b.material_name %% a.material_name
+                        AND b.active
+                        AND b.supplier_id = a.supplier_id
+                        AND b.material_type = a.material_type
+                        AND b.id > a.id
+                    WHERE a.active AND a.supplier_id = %(supplier)s AND a.material_type = %(type)s
+                ) pairs
+                WHERE score >= %(min_score)s
+                ON CONFLICT (material_id, duplicate_id) DO UPDATE SET
+                    name_score = EXCLUDED.name_score,
+                    code_score = EXCLUDED.code_score,
+                    score = EXCLUDED.score,
+                    run_id = EXCLUDED.run_id,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+                WHERE material_duplicate_candidate.state = 'pending'
+            """, {
+                'supplier': supplier_id,
+                'type': material_type,
+                'run': run.id,
+                'uid': self.env.uid,
+                'name_weight': NAME_WEIGHT,
+                'code_weight': CODE_WEIGHT,
+                'min_score': min_score,
+            })
+
+        self._cr.execute("""
+            DELETE FROM material_duplicate_candidate
+            WHERE state = 'pending' AND run_id IS DISTINCT FROM %s
+        """, (run.id,))
+        self._cr.execute("SELECT COUNT(*) FROM material_duplicate_candidate WHERE run_id = %s", (run.id,))
+        candidate_count = self._cr.fetchone()[0]
+        self.invalidate_cache()
+
+        run.write({
+            'duration': time.time() - start,
+            'material_count': material_count,
+            'block_count': len(blocks),
+            'largest_block': max([block[2] for block in blocks] or [0]),
+            'candidate_count': candidate_count,
+        })
+        _logger.info("Duplicate detection: %s candidates among %s materials in %s blocks (largest %s) in %.1f s",
+                     candidate_count, material_count, len(blocks), run.largest_block, run.duration)
+        return run
+
+    def action_archive_duplicate(self):
+        """Archive the possible duplicate and keep the original material"""
+        self.mapped('duplicate_id').action_archive()
+        self.write({'state': 'merged'})
+
+    def action_dismiss(self):
+        """Mark the pair as distinct materials so later runs keep it out of review"""
+        self.write({'state': 'dismissed'})
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+PRICE_BANDS = [
+    ('100_499', '100 - 499'),
+    ('500_999', '500 - 999'),
+    ('1000_4999', '1,000 - 4,999'),
+    ('5000_plus', '5,000+'),
+]
+
+
+class MaterialReport(models.Model):
+    _name = 'material.report'
+    _description = 'Material Analysis Report'
+    _auto = False
+    _rec_name = 'material_name'
+    _order = 'material_code'
+
+    material_id = fields.Many2one('material.material', string='Material', readonly=True)
+    material_code = fields.Char(string='Material Code', readonly=True)
+    material_name = fields.Char(string='Material Name', readonly=True)
+    material_type = fields.Selection(
+        [
+            ('fabric', 'Fabric'),
+            ('jeans', 'Jeans'),
+            ('cotton', 'Cotton'),
+        ],
+        string='Material Type',
+        readonly=True
+    )
+    supplier_id = fields.Many2one('material.supplier', string='Supplier', readonly=True)
+    supplier_name = fields.Char(string='Supplier Name', readonly=True)
+    price_band = fields.Selection(PRICE_BANDS, string='Price Band', readonly=True)
+    material_buy_price = fields.Float(string='Buy Price', readonly=True, group_operator='avg')
+    total_buy_price = fields.Float(string='Total Buy Price', readonly=True)
+    material_count = fields.Integer(string='# Materials', readonly=True)
+
+    def _query(self):
+        return """
+            SELECT
+                m.id AS id,
+                m.id AS material_id,
+                m.material_code,
+                m.material_name,
+                m.material_type,
+                m.supplier_id,
+                s.name AS supplier_name,
+                CASE
+                    WHEN m.material_buy_price < 500 THEN '100_499'
+                    WHEN m.material_buy_price < 1000 THEN '500_999'
+                    WHEN m.material_buy_price < 5000 THEN '1000_4999'
+                    ELSE '5000_plus'
+                END AS price_band,
+                m.material_buy_price,
+                m.material_buy_price AS total_buy_price,
+                1 AS material_count
+            FROM material_material m
+            JOIN material_supplier s ON s.id = m.supplier_id
+            WHERE m.active
+        """
+
+    @api.model
+    def _is_materialized(self):
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'material_management.report_materialized', 'False') in ('1', 'True', 'true')
+
+    def init(self):
+        """(Re)create the reporting view, materialized if configured"""
+        self._cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", (self._table,))
+        row = self._cr.fetchone()
+        if row and row[0] == 'm':
+            self._cr.execute("DROP MATERIALIZED VIEW IF EXISTS %s CASCADE" % self._table)
+        elif row:
+            self._cr.execute("DROP VIEW IF EXISTS %s CASCADE" % self._table)
+
+        if self._is_materialized():
+            self._cr.execute("CREATE MATERIALIZED VIEW %s AS (%s)" % (self._table, self._query()))
+            # Unique index required by REFRESH ... CONCURRENTLY
+            self._cr.execute("CREATE UNIQUE INDEX %s_id_idx ON %s (id)" % (self._table, self._table))
+            self._cr.execute("CREATE INDEX %s_type_supplier_idx ON %s (material_type, supplier_id)" % (self._table, self._table))
+        else:
+            self._cr.execute("CREATE VIEW %s AS (%s)" % (self._table, self._query()))
+
+    @api.model
+    def refresh_report(self):
+        """Refresh the materialized view (called by cron); no-op for a plain view"""
+        self._cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", (self._table,))
+        row = self._cr.fetchone()
+        if not row or row[0] != 'm':
+            return
+        self._cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY %s" % self._table)
+        self.invalidate_cache()
+        _logger.info("Refreshed materialized view %s", self._table)
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import date
+
+import psycopg2
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class MaterialPriceHistory(models.Model):
+    _name = 'material.price.history'
+    _description = 'Material Price History'
+    _auto = False
+    _log_access = False
+    _order = 'changed_at desc, id desc'
+    _rec_name = 'material_id'
+
+    material_id = fields.Many2one('material.material', string='Material', readonly=True)
+    supplier_id = fields.Many2one('material.supplier', string='Supplier', readonly=True)
+    price = fields.Float(string='Price', readonly=True)
+    previous_price = fields.Float(string='Previous Price', readonly=True)
+    changed_at = fields.Datetime(string='Changed At', readonly=True)
+    user_id = fields.Many2one('res.users', string='Changed By', readonly=True)
+
+    def init(self):
+        """Create the append-only history table, range partitioned by month.
+
+        The ORM cannot create partitioned tables, hence ``_auto = False``.
+        The primary key has to include the partition key. Indexes on
+        (material_id, changed_at) and (supplier_id, changed_at) are created
+        on every partition, so series and as-of lookups are index range
+        scans limited to the partitions of the requested period.
+        """
+        self._cr.execute("SELECT 1 FROM pg_class WHERE relname = 'material_price_history'")
+        if self._cr.fetchone():
+            self._ensure_partitions()
+            return
+
+        self._cr.execute("""
+            CREATE TABLE material_price_history (
+                id BIGSERIAL,
+                material_id INTEGER NOT NULL,
+                supplier_id INTEGER,
+                price DOUBLE PRECISION NOT NULL,
+                previous_price DOUBLE PRECISION,
+                changed_at TIMESTAMP NOT NULL,
+                user_id INTEGER,
+                PRIMARY KEY (id, changed_at)
+            ) PARTITION BY RANGE (changed_at)
+        """)
+        self._cr.execute("""
+            CREATE TABLE material_price_history_default
+            PARTITION OF material_price_history DEFAULT
+        """)
+        self._cr.execute("""
+            CREATE INDEX material_price_history_material_idx
+            ON material_price_history (material_id, changed_at)
+        """)
+        self._cr.execute("""
+            CREATE INDEX material_price_history_supplier_idx
+            ON material_price_history (supplier_id, changed_at)
+        """)
+
+        # Seed the history with the current price of existing materials
+        self._cr.execute("""
+            SELECT MIN(COALESCE(write_date, create_date)) FROM material_material
+        """)
+        oldest = self._cr.fetchone()[0]
+        self._ensure_partitions(start=oldest.date() if oldest else None)
+        self._cr.execute("""
+            INSERT INTO material_price_history (material_id, supplier_id, price, changed_at, user_id)
+            SELECT id, supplier_id, material_buy_price,
+                   COALESCE(write_date, create_date, now() at time zone 'UTC'), write_uid
+            FROM material_material
+        """)
+
+    @api.model
+    def _ensure_partitions(self, start=None, months_ahead=3):
+        """Create monthly partitions from ``start`` (default: this month) up to ``months_ahead``.
+
+        Called daily by cron so that inserts always land in a monthly
+        partition instead of the default one.
+        """
+        month = (start or date.today()).replace(day=1)
+        last = date.today().replace(day=1) + relativedelta(months=months_ahead)
+        while month <= last:
+            next_month = month + relativedelta(months=1)
+            try:
+                with self._cr.savepoint():
+                    self._cr.execute("""
+                        CREATE TABLE IF NOT EXISTS material_price_history_y{year}m{month:02d}
+                        PARTITION OF material_price_history
+                        FOR VALUES FROM (%s) TO (%s)
+                    """.format(year=month.year, month=month.month), (month, next_month))
+            except psycopg2.Error as e:
+                # Rows of that month already landed in the default partition
+                _logger.warning("Could not create price history partition for %s: %s", month, e)
+            month = next_month
+
+    @api.model
+    def _record(self, rows):
+        """Append price changes: ``rows`` are (material_id, supplier_id, price, previous_price).
+
+        ``clock_timestamp()`` keeps successive changes made in one transaction
+        ordered, so "latest change before X" never needs a tie-breaker.
+        """
+        if not rows:
+            return
+        values = ", ".join(["(%s, %s, %s, %s, clock_timestamp() at time zone 'UTC', %s)"] * len(rows))
+        params = [value for row in rows for value in tuple(row) + (self.env.uid,)]
+        self._cr.execute("""
+            INSERT INTO material_price_history (material_id, supplier_id, price, previous_price, changed_at, user_id)
+            VALUES {values}
+        """.format(values=values), params)
+
+    @api.model
+    def _delete_material_history(self, material_ids):
+        """Delete the history of deleted materials; archived materials keep theirs"""
+        if material_ids:
+            self._cr.execute("DELETE FROM material_price_history WHERE material_id IN %s", (tuple(material_ids),))
+
+    @api.model
+    def get_series(self, date_from, date_to, material_id=None, supplier_id=None, limit=10000, after=None):
+        """Return up to ``limit`` price changes of a material or a supplier's materials in [date_from, date_to).
+
+        Returns the changes and the ``(changed_at, id)`` key to pass as
+        ``after`` to get the next ones, or None when the series is complete.
+        """
+        column, value = ('material_id', material_id) if material_id else ('supplier_id', supplier_id)
+        params = [value, date_from, date_to]
+        after_clause = ''
+        if after:
+            after_clause = 'AND (changed_at, id) > (%s, %s)'
+            params += list(after)
+        self._cr.execute("""
+            SELECT id, material_id, price, previous_price, changed_at
+            FROM material_price_history
+            WHERE {column} = %s AND changed_at >= %s AND changed_at < %s {after}
+            ORDER BY changed_at, id
+            LIMIT %s
+        """.format(column=column, after=after_clause), params + [limit + 1])
+        rows = self._cr.fetchall()
+        next_key = (rows[limit - 1][4], rows[limit - 1][0]) if len(rows) > limit else None
+        return [{
+            'material_id': material_id,
+            'price': price,
+            'previous_price': previous_price,
+            'changed_at': fields.Datetime.to_string(changed_at),
+        } for _id, material_id, price, previous_price, changed_at in rows[:limit]], next_key
+
+    @api.model
+    def get_prices_as_of(self, as_of, supplier_id=None, material_type=None):
+        """Return the price of every active material as it was at ``as_of``.
+
+        One LATERAL index probe per material on (material_id, changed_at)
+        instead of scanning all history up to ``as_of``.
+        """
+        where, params = ['m.active'], [as_of]
+        if supplier_id:
+            where.append('m.supplier_id = %s')
+            params.append(supplier_id)
+        if material_type:
+            where.append('m.material_type = %s')
+            params.append(material_type)
+        self._cr.execute("""
+            SELECT m.id, m.material_code, h.price, h.changed_at
+            FROM material_material m
+            CROSS JOIN LATERAL (
+                SELECT price, changed_at
+                FROM material_price_history
+                WHERE material_id = m.id AND changed_at <= %s
+                ORDER BY changed_at DESC
+                LIMIT 1
+            ) h
+            WHERE {where}
+            ORDER BY m.material_code
+        """.format(where=' AND '.join(where)), params)
+        return [{
+            'material_id': material_id,
+            'material_code': material_code,
+            'price': price,
+            'changed_at': fields.Datetime.to_string(changed_at),
+        } for material_id, material_code, price, changed_at in self._cr.fetchall()]
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+import psycopg2
+from psycopg2.extensions import QueryCanceledError, TRANSACTION_STATUS_INERROR
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Per-worker time of the last capture, keyed by (database name, route name)
+_last_capture = {}
+_last_capture_lock = threading.Lock()
+
+MAX_PARAMS_LENGTH = 10000
+# EXPLAIN ANALYZE executes the statement, so only plain reads are analyzed
+_explainable = re.compile(r'^\s*\(?\s*(SELECT|WITH|INSERT|UPDATE|DELETE|VALUES)\b', re.IGNORECASE)
+_read_only = re.compile(r'^\s*\(?\s*SELECT\b', re.IGNORECASE)
+_side_effects = re.compile(r'\b(FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE|nextval|setval|set_config|pg_\w*advisory\w*)\b',
+                           re.IGNORECASE)
+
+
+class StatementRecorder(object):
+    """Record the statements executed on a cursor with their duration"""
+
+    def __init__(self, cr):
+        self.cr = cr
+        self.statements = []
+
+    def __enter__(self):
+        execute = self.cr.execute
+
+        def recording_execute(query, params=None, *args, **kwargs):
+            start = time.time()
+            try:
+                return execute(query, params, *args, **kwargs)
+            finally:
+                self.statements.append((query, params, time.time() - start))
+
+        self.cr.execute = recording_execute
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        del self.cr.execute
+
+
+class SlowRequest(models.Model):
+    _name = 'material.slow.request'
+    _description = 'Slow API Request'
+    _order = 'date desc, id desc'
+    _rec_name = 'route'
+
+    date = fields.Datetime(string='Date', readonly=True, index=True)
+    route = fields.Char(string='Route', readonly=True, index=True)
+    method = fields.Char(string='HTTP Method', readonly=True)
+    path = fields.Char(string='Path', readonly=True)
+    params = fields.Text(string='Parameters', readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True, ondelete='set null')
+    duration_ms = fields.Float(string='Duration (ms)', readonly=True, digits=(16, 1))
+    query_count = fields.Integer(string='Queries', readonly=True)
+    sql_duration_ms = fields.Float(string='SQL Time (ms)', readonly=True, digits=(16, 1),
+                                   help="Only known when the request's statements were sampled")
+    sampled = fields.Boolean(string='Statements Captured', readonly=True)
+    outcome = fields.Selection([
+        ('done', 'Completed'),
+        ('error', 'Failed'),
+        ('timeout', 'Statement Timeout'),
+    ], string='Outcome', default='done', readonly=True, index=True,
+        help="Failed and timed out requests are recorded from a separate transaction, "
+             "since their own one is aborted or rolled back")
+    statement_ids = fields.One2many('material.slow.request.statement', 'request_id', string='Slowest Statements',
+                                    readonly=True)
+
+    @api.model
+    def _get_param(self, key, default):
+        value = self.env['ir.config_parameter'].sudo().get_param('material_management.slow_query.%s' % key)
+        return default if value in (None, False, '') else float(value)
+
+    @api.model
+    def _monitor(self, route_name, call, get_request_info):
+        """Run ``call`` and record the request if it takes longer than the threshold.
+
+        A sampled share of requests also records its statements, so that
+        a slow one can be stored with its slowest statements and their
+        plans. ``get_request_info`` returns the method, path, params and
+        user of the request; it is only called for slow requests. Requests
+        that raise are recorded too, statement timeouts whatever their
+        duration, before the exception is propagated.
+        """
+        threshold = self._get_param('threshold_ms', 2000)
+        if threshold <= 0:
+            return call()
+
+        recorder = StatementRecorder(self._cr) if random.random() < self._get_param('sample_rate', 0.25) else None
+        query_count = self._cr.sql_log_count
+        start = time.time()
+        try:
+            if recorder:
+                with recorder:
+                    result = call()
+            else:
+                result = call()
+        except Exception as e:
+            self._record_slow(route_name, get_request_info, time.time() - start, threshold,
+                              self._cr.sql_log_count - query_count, recorder, error=e)
+            raise
+        self._record_slow(route_name, get_request_info, time.time() - start, threshold,
+                          self._cr.sql_log_count - query_count, recorder)
+        return result
+
+    @api.model
+    def _record_slow(self, route_name, get_request_info, duration, threshold, query_count, recorder, error=None):
+        """Capture the request if it was slow or timed out; never raises.
+
+        A request that raised is rolled back and one whose transaction is
+        aborted cannot run any statement, so both are recorded on a
+        separate cursor.
+        """
+        timed_out = isinstance(error, QueryCanceledError)
+        if duration * 1000 < threshold and not timed_out:
+            return
+        in_error = self._cr._cnx.get_transaction_status() == TRANSACTION_STATUS_INERROR
+        outcome = 'timeout' if timed_out else 'error' if error is not None or in_error else 'done'
+        statements = recorder.statements if recorder else None
+        try:
+            if outcome == 'done':
+                if self._may_capture(route_name):
+                    self._capture(route_name, get_request_info(), duration, query_count, statements)
+                return
+            with self.pool.cursor() as capture_cr:
+                monitor = self.with_env(self.env(cr=capture_cr))
+                if monitor._may_capture(route_name):
+                    monitor._capture(route_name, get_request_info(), duration, query_count, statements, outcome)
+        except Exception:
+            _logger.exception("Failed to record slow request on %s", route_name)
+
+    @api.model
+    def _may_capture(self, route_name):
+        """Allow one capture per route every ``min_interval`` seconds in this worker"""
+        min_interval = self._get_param('min_interval', 60)
+        key = (self._cr.dbname, route_name)
+        now = time.monotonic()
+        with _last_capture_lock:
+            if now - _last_capture.get(key, -min_interval) < min_interval:
+                return False
+            _last_capture[key] = now
+        return True
+
+    @api.model
+    def _capture(self, route_name, request_info, duration, query_count, statements, outcome='done'):
+        """Store the slow request with its slowest statements and their plans.
+
+        Completed requests are captured on the request's cursor, so this
+        takes no extra database connection: each plan is computed in a
+        savepoint under ``explain_timeout_ms``, and the record is created in
+        another savepoint so a failure never affects the request. All plans
+        of a request share an ``explain_budget_ms`` time budget; statements
+        past it are stored without a plan.
+        """
+        max_statements = int(self._get_param('max_statements', 10))
+        slowest = sorted(statements or [], key=lambda statement: statement[2], reverse=True)[:max_statements]
+
+        lines = []
+        if slowest:
+            cr = self._cr
+            explain_timeout = self._get_param('explain_timeout_ms', 10000)
+            deadline = time.monotonic() + self._get_param('explain_budget_ms', 10000) / 1000
+            cr.execute("SHOW statement_timeout")
+            statement_timeout = cr.fetchone()[0]
+            try:
+                for sequence, (query, params, statement_duration) in enumerate(slowest, 1):
+                    sql = self._mogrify(cr, query, params)
+                    remaining = (deadline - time.monotonic()) * 1000
+                    if remaining >= 1:
+                        cr.execute("SET LOCAL statement_timeout = %s", (int(min(explain_timeout, remaining)),))
+                        plan, analyzed = self._explain(cr, sql)
+                    else:
+                        plan, analyzed = 'Not explained: explain_budget_ms exhausted', False
+                    lines.append((0, 0, {
+                        'sequence': sequence,
+                        'query': sql,
+                        'duration_ms': statement_duration * 1000,
+                        'plan': plan,
+                        'analyzed': analyzed,
+                    }))
+            finally:
+                cr.execute("SELECT set_config('statement_timeout', %s, true)", (statement_timeout,))
+
+        params = json.dumps(request_info.get('params'), default=str)
+        with self._cr.savepoint():
+            self.sudo().create({
+                'date': fields.Datetime.now(),
+                'route': route_name,
+                'method': request_info.get('method'),
+                'path': request_info.get('path'),
+                'params': params[:MAX_PARAMS_LENGTH],
+                'user_id': request_info.get('user_id'),
+                'duration_ms': duration * 1000,
+                'query_count': query_count,
+                'sql_duration_ms': sum(statement[2] for statement in statements) * 1000 if statements is not None else 0,
+                'sampled': statements is not None,
+                'outcome': outcome,
+                'statement_ids': lines,
+            })
+        _logger.warning("Slow request on %s (%s): %.0f ms, %s queries", route_name, outcome, duration * 1000,
+                        query_count)
+
+    @api.model
+    def _mogrify(self, cr, query, params):
+        try:
+            sql = cr.mogrify(query, params)
+            return sql.decode() if isinstance(sql, bytes) else sql
+        except (psycopg2.Error, TypeError, ValueError):
+            return str(query)
+
+    @api.model
+    def _explain(self, cr, sql):
+        """Return ``(plan, analyzed)`` for ``sql``.
+
+        Reads without side effects are run with EXPLAIN (ANALYZE, BUFFERS);
+        writes only get their estimated plan, so they are never executed
+        twice.
+        """
+        if not _explainable.match(sql):
+            return False, False
+        analyzed = bool(_read_only.match(sql)) and not _side_effects.search(sql)
+        options = 'ANALYZE, BUFFERS' if analyzed else 'COSTS'
+        try:
+            with cr.savepoint():
+                cr.execute('EXPLAIN (%s) %s' % (options, sql))
+                return '\n'.join(row[0] for row in cr.fetchall()), analyzed
+        except psycopg2.Error as e:
+            return 'EXPLAIN failed: %s' % e, False
+
+    @api.model
+    def _gc_slow_requests(self):
+        """Delete slow requests older than ``keep_days`` (called by cron)"""
+        keep_days = int(self._get_param('keep_days', 30))
+        self._cr.execute("""
+            DELETE FROM material_slow_request
+            WHERE date < (now() at time zone 'UTC') - %s * interval '1 day'
+        """, (keep_days,))
+
+
+class SlowRequestStatement(models.Model):
+    _name = 'material.slow.request.statement'
+    _description = 'Slow API Request Statement'
+    _order = 'request_id, sequence'
+
+    request_id = fields.Many2one('material.slow.request', string='Request', required=True, ondelete='cascade',
+                                 index=True)
+    sequence = fields.Integer(string='Rank', readonly=True)
+    query = fields.Text(string='Statement', readonly=True)
+    duration_ms = fields.Float(string='Duration (ms)', readonly=True, digits=(16, 1))
+    plan = fields.Text(string='Plan', readonly=True)
+    analyzed = fields.Boolean(string='Analyzed', readonly=True,
+                              help="The plan shows actual timings and buffers (EXPLAIN ANALYZE)")
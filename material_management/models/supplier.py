@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import psycopg2
+
 from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
 
 
 class Supplier(models.Model):
     _name = 'material.supplier'
+    _inherit = ['material.autocomplete.mixin']
     _description = 'Material Supplier'
     _order = 'name'
 
@@ -26,12 +29,47 @@ class Supplier(models.Model):
         string='Address',
         help="Supplier address"
     )
+    active = fields.Boolean(
+        string='Active',
+        default=True,
+        help="Uncheck to archive the supplier without deleting it"
+    )
+
+    _autocomplete_fields = ['name']
 
     # Add SQL constraint for unique name
     _sql_constraints = [
         ('name_unique', 'UNIQUE(name)', 'Supplier name already exists. Please use a unique supplier name.')
     ]
 
+    def init(self):
+        """Create a partial index covering only active suppliers, and a
+        case-insensitive unique index on the name.
+
+        The ``lower(name)`` index spans archived suppliers too, like
+        ``name_unique``, and serves name lookups and keyset pagination.
+        The upgrade fails while names differ only by case; rename those
+        suppliers, then update the module again.
+        """
+        super(Supplier, self).init()
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_supplier_active_name_idx
+            ON material_supplier (name) WHERE active
+        """)
+        try:
+            with self._cr.savepoint():
+                self._cr.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS material_supplier_lower_name_unique
+                    ON material_supplier (lower(name))
+                """)
+        except psycopg2.IntegrityError:
+            self._cr.execute("""
+                SELECT lower(name) FROM material_supplier
+                GROUP BY lower(name) HAVING COUNT(*) > 1
+            """)
+            raise UserError("Supplier names must be unique regardless of case. Rename the suppliers named %s, "
+                            "then update the module again." % ', '.join(row[0] for row in self._cr.fetchall()))
+
     @api.constrains('name')
     def _check_supplier_name(self):
         """Validate supplier name is not empty"""
@@ -44,4 +82,54 @@ class Supplier(models.Model):
         result = []
         for record in self:
             result.append((record.id, record.name))
-        return result 
\ No newline at end of file
+        return result 
+
+    def _autocomplete_rows(self):
+        self.flush(['name', 'active'])
+        self._cr.execute("SELECT id, name FROM material_supplier WHERE active")
+        return [(supplier_id, (name, supplier_id), name, (name,)) for supplier_id, name in self._cr.fetchall()]
+
+    @api.model
+    def name_search(self, name='', args=None, operator='ilike', limit=100):
+        """Answer unfiltered prefix searches (``=ilike`` with ``name%``) from the in-memory prefix index when it is warm"""
+        result = self._autocomplete_name_search(name, operator, args, limit)
+        if result is not None:
+            return result
+        return super(Supplier, self).name_search(name, args, operator, limit)
+
+    @api.model
+    def _find_by_name(self, name, include_archived=False):
+        """Return the supplier named ``name``, ignoring case, in one index probe"""
+        self.flush(['name', 'active'])
+        self._cr.execute("""
+            SELECT id FROM material_supplier
+            WHERE lower(name) = lower(%s){active}
+        """.format(active='' if include_archived else ' AND active'), (name,))
+        return self.browse([row[0] for row in self._cr.fetchall()])
+
+    @api.model
+    def _search_page(self, after=None, limit=100, include_archived=False):
+        """Return up to ``limit`` suppliers ordered by ``lower(name)``, starting after ``after``.
+
+        Keyset pagination on the unique ``lower(name)`` index: every page is
+        one index range scan, however deep. The id breaks ties, so no
+        supplier is skipped even if names were not unique. Returns the
+        suppliers and the ``(lower(name), id)`` key to pass as ``after`` for
+        the next page, or None on the last page.
+        """
+        self.flush(['name', 'active'])
+        where, params = [], []
+        if after is not None:
+            where.append('(lower(name), id) > (%s, %s)')
+            params += list(after)
+        if not include_archived:
+            where.append('active')
+        self._cr.execute("""
+            SELECT id, lower(name) FROM material_supplier
+            {where}
+            ORDER BY lower(name), id
+            LIMIT %s
+        """.format(where='WHERE ' + ' AND '.join(where) if where else ''), params + [limit + 1])
+        rows = self._cr.fetchall()
+        next_key = (rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return self.browse([row[0] for row in rows[:limit]]), next_key
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+from odoo import models, api, tools
+
+from .api_throttle import ROUTE_LIMITS
+
+_logger = logging.getLogger(__name__)
+
+# Hot routes whose admission control settings are read on every request
+WARMUP_ROUTES = ['get_materials', 'get_material', 'get_suppliers', 'autocomplete', 'lookup_materials']
+WARMUP_PARAMS = [
+    'api_auth', 'api_key_cache_ttl', 'rate_limit.capacity', 'rate_limit.per_second',
+    'slow_query.threshold_ms', 'slow_query.sample_rate', 'supplier_page_size',
+]
+# Relations read by the material and supplier listings
+WARMUP_RELATIONS = [
+    'material_material',
+    'material_material_active_type_code_idx',
+    'material_material_active_supplier_idx',
+    'material_material_material_code_unique',
+    'material_supplier',
+    'material_supplier_lower_name_unique',
+]
+
+
+class Warmup(models.AbstractModel):
+    _name = 'material.warmup'
+    _description = 'Material API Warm-up'
+
+    def _register_hook(self):
+        """Warm up when the registry is loaded, if enabled.
+
+        With ``--workers`` and a database given on the command line the
+        registry is loaded by the master process before forking, so every
+        worker starts warm. Skipped while installing or updating modules
+        and when running tests.
+        """
+        super(Warmup, self)._register_hook()
+        if tools.config['init'] or tools.config['update'] or tools.config['test_enable']:
+            return
+        enabled = self.env['ir.config_parameter'].sudo().get_param('material_management.warmup_on_start')
+        if enabled not in ('1', 'true', 'True'):
+            return
+        try:
+            with self._cr.savepoint():
+                self.warm_up()
+        except Exception:
+            _logger.exception("Material API warm-up failed")
+
+    @api.model
+    def warm_up(self):
+        """Pre-populate this worker's caches and the database buffers used by the listing routes.
+
+        Also called by the warm-up cron (inactive by default), which only
+        helps the HTTP workers through the database buffers. Returns the
+        duration of each step in milliseconds. The listing queries are timed
+        before (cold) and after (warm) the other steps to show how much
+        cold-start latency the warm-up removes.
+        """
+        timings = {}
+        start = time.time()
+        queries = self._listing_queries()
+        for name, query in queries:
+            timings['%s_cold' % name] = self._time_query(query)
+
+        step = time.time()
+        ICP = self.env['ir.config_parameter'].sudo()
+        for key in WARMUP_PARAMS:
+            ICP.get_param('material_management.%s' % key)
+        for route_name in set(WARMUP_ROUTES) | set(ROUTE_LIMITS):
+            ICP.get_param('material_management.throttle.%s.statement_timeout_ms' % route_name)
+            ICP.get_param('material_management.throttle.%s.max_concurrency' % route_name)
+        timings['config'] = (time.time() - step) * 1000
+
+        step = time.time()
+        self.env['material.material'].sudo()._autocomplete_build()
+        self.env['material.supplier'].sudo()._autocomplete_build()
+        timings['autocomplete'] = (time.time() - step) * 1000
+
+        step = time.time()
+        prewarm_method = self._prewarm_relations()
+        timings['prewarm'] = (time.time() - step) * 1000
+
+        for name, query in queries:
+            timings['%s_warm' % name] = self._time_query(query)
+
+        timings['total'] = (time.time() - start) * 1000
+        _logger.info("Material API warm-up done in %.0f ms (prewarm with %s): %s",
+                     timings['total'], prewarm_method,
+                     ', '.join('%s=%.1f ms' % (key, value) for key, value in sorted(timings.items()) if key != 'total'))
+        return timings
+
+    def _time_query(self, query):
+        """Run ``query`` on an empty record cache and return its duration in milliseconds"""
+        self.env['material.material'].invalidate_cache()
+        start = time.time()
+        query()
+        return (time.time() - start) * 1000
+
+    def _prewarm_relations(self):
+        """Load the listing tables and indexes into shared buffers.
+
+        Uses pg_prewarm when the extension is installed; otherwise reads
+        them through the queries of ``_listing_queries``.
+        """
+        self._cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm'")
+        if not self._cr.fetchone():
+            return 'queries'
+        self._cr.execute("""
+            SELECT pg_prewarm(c.oid)
+            FROM pg_class c
+            WHERE c.relname IN %s AND c.relkind IN ('r', 'i')
+        """, (tuple(WARMUP_RELATIONS),))
+        return 'pg_prewarm'
+
+    def _listing_queries(self):
+        """Return ``(name, callable)`` pairs running the most common listing queries"""
+        Material = self.env['material.material'].sudo()
+        Supplier = self.env['material.supplier'].sudo()
+        ICP = self.env['ir.config_parameter'].sudo()
+        page_size = int(ICP.get_param('material_management.supplier_page_size', 100))
+        # Enough rows to load the upper index levels and hot pages without reading a huge catalog
+        limit = int(ICP.get_param('material_management.warmup_limit', 1000))
+        field_names = ['material_code', 'material_name', 'material_type', 'material_buy_price', 'supplier_id', 'version']
+
+        def listing(domain):
+            return lambda: Material.search(domain, limit=limit).read(field_names)
+
+        queries = [('materials', listing([]))]
+        for material_type, _label in Material._fields['material_type'].selection:
+            queries.append(('materials_%s' % material_type, listing([('material_type', '=', material_type)])))
+        queries.append(('suppliers', lambda: Supplier._search_page(None, page_size)[0].read(['name', 'email'])))
+        return queries
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Benchmark near-duplicate detection on a large synthetic catalog.
+
+Run inside an Odoo shell on a test database; all changes are rolled back::
+
+    python3 odoo-bin shell -c odoo.conf -d test_db < scripts/benchmark_duplicates.py
+
+For each catalog size, inserts materials spread over suppliers and types,
+with a few percent of near-duplicate names, then runs the detection job and
+reports its runtime and block statistics.
+"""
+
+import random
+import time
+
+CATALOG_SIZES = [10000, 50000, 100000]
+SUPPLIER_COUNT = 200
+DUPLICATE_RATE = 0.02
+WORDS = ['Blue', 'Black', 'White', 'Raw', 'Stretch', 'Washed', 'Denim', 'Twill', 'Canvas', 'Jersey',
+         'Poplin', 'Selvedge', 'Organic', 'Heavy', 'Light', 'Indigo', 'Khaki', 'Oxford', 'Chambray', 'Fleece']
+
+Candidate = env['material.duplicate.candidate']  # noqa: F821 (provided by odoo shell)
+rng = random.Random(42)
+suppliers = env['material.supplier'].create([  # noqa: F821
+    {'name': 'Duplicate Benchmark Supplier %s' % i} for i in range(SUPPLIER_COUNT)
+])
+
+print('%10s %10s %10s %14s %12s %12s' % ('materials', 'blocks', 'largest', 'candidates', 'insert s', 'detect s'))
+try:
+    for size in CATALOG_SIZES:
+        env.cr.execute("SAVEPOINT benchmark_duplicates")  # noqa: F821
+        rows = []
+        for i in range(size):
+            if rows and rng.random() < DUPLICATE_RATE:
+                # Same supplier and type, slightly different name and code
+                code, name, material_type, supplier_id = rows[rng.randrange(len(rows))]
+                rows.append((code + 'X%s' % i, name.replace(' ', '  ', 1) + ' ', material_type, supplier_id))
+            else:
+                name = ' '.join(rng.sample(WORDS, 3)) + ' %s' % rng.randint(1, 999)
+                rows.append(('DB%s-%07d' % (size, i), name, rng.choice(['fabric', 'jeans', 'cotton']),
+                             suppliers[rng.randrange(SUPPLIER_COUNT)].id))
+
+        start = time.time()
+        env.cr.execute("""
+            INSERT INTO material_material (material_code, material_name, material_type, material_buy_price,
+                                           supplier_id, active, version)
+            SELECT code, name, material_type, 100, supplier_id, TRUE, 1
+            FROM unnest(%s::varchar[], %s::varchar[], %s::varchar[], %s::int[])
+                AS t(code, name, material_type, supplier_id)
+        """, [list(column) for column in zip(*rows)])  # noqa: F821
+        env.cr.execute("ANALYZE material_material")  # noqa: F821
+        insert_time = time.time() - start
+
+        run = Candidate.detect_duplicates()
+        print('%10d %10d %10d %14d %12.1f %12.1f' % (
+            run.material_count, run.block_count, run.largest_block, run.candidate_count, insert_time, run.duration))
+        env.cr.execute("ROLLBACK TO SAVEPOINT benchmark_duplicates")  # noqa: F821
+finally:
+    env.cr.rollback()  # noqa: F821
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Benchmark material constraint validation on large batched creates.
+
+Run inside an Odoo shell on a test database; all changes are rolled back::
+
+    python3 odoo-bin shell -c odoo.conf -d test_db < scripts/benchmark_validation.py
+
+For each batch size, creates the materials in one ``create()`` call, then
+re-runs the constraint checks on a cold cache and reports validation time and
+SQL queries per row. Both should stay flat as the batch grows.
+"""
+
+import time
+
+BATCH_SIZES = [100, 1000, 5000, 10000]
+CONSTRAINED_FIELDS = ['material_buy_price', 'material_code', 'material_type', 'supplier_id']
+
+Material = env['material.material']  # noqa: F821 (provided by odoo shell)
+suppliers = env['material.supplier'].create([  # noqa: F821
+    {'name': 'Validation Benchmark Supplier %s' % i} for i in range(20)
+])
+
+print('%8s %12s %14s %12s %14s' % ('rows', 'create s', 'validate ms', 'queries', 'us/row'))
+try:
+    for size in BATCH_SIZES:
+        values = [{
+            'material_code': 'VB%s-%06d' % (size, i),
+            'material_name': 'Validation Benchmark %s' % i,
+            'material_type': ('fabric', 'jeans', 'cotton')[i % 3],
+            'material_buy_price': 100.0 + i % 900,
+            'supplier_id': suppliers[i % len(suppliers)].id,
+        } for i in range(size)]
+
+        start = time.time()
+        materials = Material.create(values)
+        create_time = time.time() - start
+
+        materials.invalidate_cache()
+        queries = env.cr.sql_log_count  # noqa: F821
+        start = time.time()
+        materials._validate_fields(CONSTRAINED_FIELDS)
+        validate_time = time.time() - start
+        queries = env.cr.sql_log_count - queries  # noqa: F821
+
+        print('%8d %12.2f %14.1f %12d %14.1f' % (
+            size, create_time, validate_time * 1000, queries, validate_time * 1e6 / size))
+finally:
+    env.cr.rollback()  # noqa: F821
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Concurrency stress test for the Material Management write paths.
+
+Fires hundreds of parallel creates/updates/deletes at a running Odoo and
+checks that the uniqueness and concurrency guarantees hold under load:
+
+* duplicate material codes / supplier names created in parallel: exactly one
+  create per code/name must succeed, the others must get the friendly
+  "already exists" error (never a 500);
+* conditional updates (If-Match) racing on the same materials: at most one
+  update per (material, version) may succeed, the others must get 409;
+* mixed create/update/delete load: throughput and error breakdown.
+
+Serialization failures, throttled responses (429/503) and connection errors
+are retried with backoff and reported as retry rates. With ``--odoo-cmd`` the script starts
+Odoo once per ``--workers`` value to report how write throughput scales with
+the worker count; otherwise it runs once against ``--url``.
+
+Uses only the standard library. Example::
+
+    python3 stress_test.py --url http://localhost:8069 --concurrency 64
+    python3 stress_test.py --odoo-cmd "python3 odoo-bin -c odoo.conf -d test_db" --workers 1,2,4,8
+"""
+
+import argparse
+import collections
+import json
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SERIALIZATION_MARKERS = ('could not serialize', 'concurrent update', 'deadlock detected')
+
+
+class Stats(object):
+    """Thread-safe outcome counters of one scenario"""
+
+    def __init__(self, name):
+        self.name = name
+        self.outcomes = collections.Counter()
+        self.retries = collections.Counter()
+        self.latencies = []
+        self.elapsed = 0.0
+        self.violations = []
+        self._lock = threading.Lock()
+
+    def record(self, outcome, latency, retries):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.latencies.append(latency)
+            for reason, count in retries.items():
+                self.retries[reason] += count
+
+    @property
+    def requests(self):
+        return sum(self.outcomes.values())
+
+    def summary(self):
+        latencies = sorted(self.latencies) or [0.0]
+        total_retries = sum(self.retries.values())
+        return {
+            'scenario': self.name,
+            'requests': self.requests,
+            'throughput_rps': round(self.requests / self.elapsed, 1) if self.elapsed else 0.0,
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+            'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1),
+            'outcomes': dict(self.outcomes),
+            'retries': dict(self.retries),
+            'retry_rate': round(total_retries / float(self.requests), 4) if self.requests else 0.0,
+            'violations': self.violations,
+        }
+
+
+class Client(object):
+    """Minimal JSON-RPC client for the material API"""
+
+    def __init__(self, base_url, timeout=60, max_retries=5):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def _request(self, method, path, params=None, headers=None):
+        """Call a JSON-RPC route with ``params``, or a plain http route (e.g. GET) without.
+
+        Only JSON-RPC calls are sent as application/json: Odoo dispatches
+        any application/json request as JSON-RPC, which http routes reject.
+        """
+        data = None
+        all_headers = {}
+        if params is not None:
+            data = json.dumps({'jsonrpc': '2.0', 'method': 'call', 'params': params, 'id': None}).encode()
+            all_headers['Content-Type'] = 'application/json'
+        all_headers.update(headers or {})
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=all_headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                payload = json.loads(response.read().decode())
+        except urllib.error.HTTPError as e:
+            retry_after = float(e.headers.get('Retry-After') or 0)
+            try:
+                payload = json.loads(e.read().decode())
+            except ValueError:
+                payload = {}
+            # Throttled JSON-RPC calls keep their result in the body
+            if isinstance(payload.get('result'), dict):
+                payload = payload['result']
+            return {'success': False, 'error': payload.get('error', str(e)),
+                    'error_code': e.code, 'retry_after': retry_after}
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            return {'success': False, 'error': str(e), 'error_code': None, 'connection_error': True}
+        if 'result' in payload and isinstance(payload['result'], dict):
+            return payload['result']
+        if 'error' in payload:
+            error = payload['error']
+            message = (error.get('data') or {}).get('message') or error.get('message')
+            return {'success': False, 'error': message, 'error_code': 500}
+        return payload
+
+    def call(self, method, path, params=None, headers=None):
+        """Send a request, retrying serialization failures and throttling.
+
+        Returns ``(result, outcome, latency, retries)``.
+        """
+        retries = collections.Counter()
+        start = time.time()
+        for attempt in range(self.max_retries + 1):
+            result = self._request(method, path, params, headers)
+            outcome = classify(result)
+            if outcome not in ('serialization_failure', 'throttled', 'connection_error') or attempt == self.max_retries:
+                break
+            retries[outcome] += 1
+            delay = result.get('retry_after') or (0.05 * 2 ** attempt)
+            time.sleep(delay * (0.5 + random.random()))
+        return result, outcome, time.time() - start, retries
+
+
+def classify(result):
+    if result.get('success'):
+        return 'success'
+    error = str(result.get('error') or '').lower()
+    code = result.get('error_code')
+    if result.get('connection_error'):
+        return 'connection_error'
+    if code in (429, 503):
+        return 'throttled'
+    if any(marker in error for marker in SERIALIZATION_MARKERS):
+        return 'serialization_failure'
+    if 'already exists' in error:
+        return 'duplicate_rejected'
+    if code == 409:
+        return 'version_conflict'
+    if code == 404:
+        return 'not_found'
+    if code == 400:
+        return 'validation_error'
+    return 'server_error'
+
+
+def run_parallel(stats, jobs, concurrency):
+    """Run ``jobs`` (callables returning ``(result, outcome, latency, retries)``) in parallel"""
+    results = []
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for result, outcome, latency, retries in executor.map(lambda job: job(), jobs):
+            stats.record(outcome, latency, retries)
+            results.append((result, outcome))
+    stats.elapsed = time.time() - start
+    return results
+
+
+def scenario_duplicate_materials(client, supplier_id, prefix, args):
+    """Many clients race to create the same material codes"""
+    stats = Stats('duplicate_material_codes')
+    codes = ['%sD%04d' % (prefix, i) for i in range(args.codes)]
+    attempts = [code for code in codes for _i in range(args.attempts)]
+    random.shuffle(attempts)
+
+    def job(code):
+        return lambda: client.call('POST', '/api/materials', {
+            'material_code': code,
+            'material_name': 'Stress %s' % code,
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': supplier_id,
+        })
+
+    results = run_parallel(stats, [job(code) for code in attempts], args.concurrency)
+
+    created = collections.Counter(
+        result['data']['material_code'] for result, outcome in results if outcome == 'success'
+    )
+    for code in codes:
+        if created[code] != 1:
+            stats.violations.append('%s created %s times' % (code, created[code]))
+    if stats.outcomes['server_error']:
+        stats.violations.append('%s duplicate creates ended in a server error' % stats.outcomes['server_error'])
+
+    # Cross-check with the database: exactly one material per code
+    lookup = client._request('POST', '/api/materials/lookup', {'codes': codes, 'include_archived': True})
+    missing = [entry['material_code'] for entry in lookup.get('data', []) if not entry['found']]
+    if missing:
+        stats.violations.append('codes missing after the race: %s' % ', '.join(missing[:10]))
+    ids = [entry['data']['id'] for entry in lookup.get('data', []) if entry['found']]
+    return stats, ids
+
+
+def scenario_duplicate_suppliers(client, prefix, args):
+    """Many clients race to create the same supplier names"""
+    stats = Stats('duplicate_supplier_names')
+    names = ['%s Supplier %04d' % (prefix, i) for i in range(max(1, args.codes // 2))]
+    attempts = [name for name in names for _i in range(args.attempts)]
+    random.shuffle(attempts)
+
+    jobs = [(lambda name=name: client.call('POST', '/api/suppliers', {'name': name})) for name in attempts]
+    results = run_parallel(stats, jobs, args.concurrency)
+
+    created = collections.Counter(result['data']['name'] for result, outcome in results if outcome == 'success')
+    for name in names:
+        if created[name] != 1:
+            stats.violations.append('%r created %s times' % (name, created[name]))
+    if stats.outcomes['server_error']:
+        stats.violations.append('%s duplicate creates ended in a server error' % stats.outcomes['server_error'])
+    return stats
+
+
+def scenario_conditional_updates(client, material_ids, args):
+    """Racing If-Match updates: at most one winner per (material, version)"""
+    stats = Stats('conditional_updates')
+    hot = material_ids[:args.hot_materials]
+    versions = {}
+    for material_id in hot:
+        result = client._request('GET', '/api/materials/%s?fields=id,version' % material_id)
+        versions[material_id] = result['data']['version']
+
+    attempts = [material_id for material_id in hot for _i in range(args.attempts)]
+    random.shuffle(attempts)
+
+    def job(material_id):
+        price = round(random.uniform(100, 1000), 2)
+        return lambda: client.call(
+            'PUT', '/api/materials/%s' % material_id, {'material_buy_price': price},
+            headers={'If-Match': '"%s"' % versions[material_id]}
+        )
+
+    results = run_parallel(stats, [job(material_id) for material_id in attempts], args.concurrency)
+
+    winners = collections.Counter(result['data']['id'] for result, outcome in results if outcome == 'success')
+    for material_id in hot:
+        if winners[material_id] > 1:
+            stats.violations.append('material %s updated %s times from version %s' % (
+                material_id, winners[material_id], versions[material_id]))
+    return stats
+
+
+def scenario_mixed_writes(client, supplier_id, prefix, args):
+    """Mixed creates, unconditional updates and deletes on a shared working set"""
+    stats = Stats('mixed_writes')
+    seed_codes = ['%sM%05d' % (prefix, i) for i in range(args.mixed)]
+    jobs = []
+    for i, code in enumerate(seed_codes):
+        jobs.append(lambda code=code: client.call('POST', '/api/materials', {
+            'material_code': code,
+            'material_name': 'Mixed %s' % code,
+            'material_type': random.choice(['fabric', 'jeans', 'cotton']),
+            'material_buy_price': 200.0,
+            'supplier_id': supplier_id,
+        }))
+    run_parallel(stats, jobs, args.concurrency)
+
+    lookup = client._request('POST', '/api/materials/lookup', {'codes': seed_codes, 'fields': ['id']})
+    ids = [entry['data']['id'] for entry in lookup.get('data', []) if entry['found']]
+
+    jobs = []
+    for _i in range(args.mixed):
+        material_id = random.choice(ids)
+        if random.random() < 0.8:
+            jobs.append(lambda material_id=material_id: client.call(
+                'PUT', '/api/materials/%s' % material_id,
+                {'material_buy_price': round(random.uniform(100, 1000), 2)}))
+        else:
+            jobs.append(lambda material_id=material_id: client.call(
+                'DELETE', '/api/materials/%s' % material_id, {}))
+    start_elapsed = stats.elapsed
+    run_parallel(stats, jobs, args.concurrency)
+    stats.elapsed += start_elapsed
+    return stats, ids
+
+
+def cleanup(client, material_ids):
+    """Delete the materials created by the run in batches"""
+    for start in range(0, len(material_ids), 200):
+        calls = [
+            {'jsonrpc': '2.0', 'method': 'material.delete', 'params': {'id': material_id}, 'id': material_id}
+            for material_id in material_ids[start:start + 200]
+        ]
+        req = urllib.request.Request(
+            client.base_url + '/api/batch?mode=savepoint', data=json.dumps(calls).encode(),
+            method='POST', headers={'Content-Type': 'application/json-batch'})
+        responses = json.loads(urllib.request.urlopen(req, timeout=client.timeout).read().decode())
+        # Materials deleted by the mixed scenario are already gone (404)
+        failed = [
+            response['id'] for response in responses
+            if 'error' in response and (response['error'].get('data') or {}).get('error_code') != 404
+        ]
+        if failed:
+            print('Cleanup could not delete %s material(s), e.g. %s' % (len(failed), failed[:10]), file=sys.stderr)
+
+
+def run_suite(base_url, args, label):
+    client = Client(base_url, timeout=args.timeout, max_retries=args.max_retries)
+    prefix = 'ST%s' % int(time.time() * 1000 % 10 ** 8)
+    supplier, _outcome, _latency, _retries = client.call('POST', '/api/suppliers', {'name': '%s Stress Supplier' % prefix})
+    if not supplier.get('success'):
+        raise RuntimeError('Could not create the stress test supplier: %s' % supplier.get('error'))
+    supplier_id = supplier['data']['id']
+
+    results = []
+    created_ids = []
+    stats, ids = scenario_duplicate_materials(client, supplier_id, prefix, args)
+    results.append(stats)
+    created_ids += ids
+    results.append(scenario_duplicate_suppliers(client, prefix, args))
+    results.append(scenario_conditional_updates(client, ids, args))
+    stats, ids = scenario_mixed_writes(client, supplier_id, prefix, args)
+    results.append(stats)
+    created_ids += ids
+
+    if not args.keep_data:
+        cleanup(client, created_ids)
+    return {'label': label, 'scenarios': [stats.summary() for stats in results]}
+
+
+def wait_until_ready(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/web/login', timeout=5).read()
+            return
+        except Exception:
+            time.sleep(1)
+    raise RuntimeError('Odoo did not start within %s seconds' % timeout)
+
+
+def run_with_workers(args):
+    """Start Odoo once per worker count and run the suite against it"""
+    reports = []
+    for workers in [int(value) for value in args.workers.split(',')]:
+        port = args.port
+        command = shlex.split(args.odoo_cmd) + ['--workers', str(workers), '--http-port', str(port)]
+        print('Starting Odoo with %s worker(s): %s' % (workers, ' '.join(command)), file=sys.stderr)
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base_url = 'http://localhost:%s' % port
+            wait_until_ready(base_url)
+            reports.append(run_suite(base_url, args, '%s worker(s)' % workers))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+    return reports
+
+
+def print_report(reports):
+    for report in reports:
+        print('\n=== %s ===' % report['label'])
+        print('%-26s %8s %10s %9s %9s %10s  %s' % (
+            'scenario', 'requests', 'req/s', 'p50 ms', 'p99 ms', 'retry rate', 'outcomes'))
+        for summary in report['scenarios']:
+            print('%-26s %8s %10s %9s %9s %10s  %s' % (
+                summary['scenario'], summary['requests'], summary['throughput_rps'],
+                summary['p50_ms'], summary['p99_ms'], summary['retry_rate'],
+                ', '.join('%s=%s' % item for item in sorted(summary['outcomes'].items()))))
+            for violation in summary['violations']:
+                print('    VIOLATION: %s' % violation)
+
+    if len(reports) > 1:
+        print('\n=== Write throughput by worker count (mixed_writes) ===')
+        baseline = None
+        for report in reports:
+            mixed = next(s for s in report['scenarios'] if s['scenario'] == 'mixed_writes')
+            baseline = baseline or mixed['throughput_rps'] or 1.0
+            print('%-14s %10s req/s  x%.2f' % (report['label'], mixed['throughput_rps'],
+                                             mixed['throughput_rps'] / baseline))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://localhost:8069', help="Odoo base URL (ignored with --odoo-cmd)")
+    parser.add_argument('--odoo-cmd', help="Command starting Odoo; run once per --workers value")
+    parser.add_argument('--workers', default='1,2,4,8', help="Comma separated worker counts for --odoo-cmd")
+    parser.add_argument('--port', type=int, default=8169, help="HTTP port used with --odoo-cmd")
+    parser.add_argument('--concurrency', type=int, default=64, help="Parallel client requests")
+    parser.add_argument('--codes', type=int, default=50, help="Distinct material codes raced on")
+    parser.add_argument('--attempts', type=int, default=8, help="Parallel attempts per code/name/version")
+    parser.add_argument('--hot-materials', type=int, default=20, help="Materials targeted by conditional updates")
+    parser.add_argument('--mixed', type=int, default=300, help="Operations per phase of the mixed scenario")
+    parser.add_argument('--max-retries', type=int, default=5, help="Retries on serialization failure/throttling/connection errors")
+    parser.add_argument('--timeout', type=float, default=60, help="Per request timeout in seconds")
+    parser.add_argument('--keep-data', action='store_true', help="Do not delete the created materials")
+    parser.add_argument('--json', help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if args.odoo_cmd:
+        reports = run_with_workers(args)
+    else:
+        reports = [run_suite(args.url, args, args.url)]
+
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(reports, output, indent=2)
+
+    violations = sum(len(s['violations']) for report in reports for s in report['scenarios'])
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,13 @@
 from . import test_material
 from . import test_supplier
+from . import test_idempotency_key
+from . import test_autocomplete
+from . import test_material_report
+from . import test_catalog_snapshot
+from . import test_api_throttle
+from . import test_price_history
+from . import test_material_duplicate
+from . import test_api_key
+from . import test_slow_request
+from . import test_warmup
 from . import test_api_controller 
\ No newline at end of file
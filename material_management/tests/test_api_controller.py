@@ -190,6 +190,455 @@ class TestMaterialAPIController(HttpCase):
         self.assertIn('result', data)
         self.assertIn('id', data)
 
+    def test_archive_material(self):
+        """Test POST /api/materials/<id>/archive and /unarchive endpoints"""
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {},
+            "id": None
+        }
+        
+        response = self.url_open(
+            '/api/materials/%s/archive' % self.material.id,
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json'}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        result = json.loads(response.content.decode())['result']
+        self.assertTrue(result.get('success'))
+        self.assertFalse(result['data']['active'])
+        
+        response = self.url_open(
+            '/api/materials/%s/unarchive' % self.material.id,
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json'}
+        )
+        
+        result = json.loads(response.content.decode())['result']
+        self.assertTrue(result.get('success'))
+        self.assertTrue(result['data']['active'])
+
+    def test_batch_savepoint_mode(self):
+        """Test POST /api/batch - failing calls are rolled back individually"""
+        unique_suffix = str(int(time.time() * 1000))[-6:]
+        
+        calls = [
+            {
+                "jsonrpc": "2.0",
+                "method": "material.create",
+                "params": {
+                    "material_code": f"BAT{unique_suffix}",
+                    "material_name": "Batch Material",
+                    "material_type": "cotton",
+                    "material_buy_price": 300.0,
+                    "supplier_id": self.supplier.id
+                },
+                "id": 1
+            },
+            {
+                "jsonrpc": "2.0",
+                "method": "material.update",
+                "params": {"id": self.material.id, "material_buy_price": 50.0},
+                "id": 2
+            },
+            {
+                "jsonrpc": "2.0",
+                "method": "material.unknown",
+                "params": {},
+                "id": 3
+            },
+        ]
+        
+        response = self.url_open(
+            '/api/batch?mode=savepoint',
+            data=json.dumps(calls),
+            headers={'Content-Type': 'application/json-batch'}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode())
+        self.assertEqual([entry['id'] for entry in data], [1, 2, 3])
+        self.assertTrue(data[0]['result']['success'])
+        self.assertEqual(data[0]['result']['data']['material_code'], f"BAT{unique_suffix}")
+        self.assertIn('error', data[1])
+        self.assertEqual(data[2]['error']['code'], -32601)
+
+    def test_batch_transaction_mode(self):
+        """Test POST /api/batch - one failing call rolls back the whole batch"""
+        unique_suffix = str(int(time.time() * 1000))[-6:]
+        
+        calls = [
+            {
+                "jsonrpc": "2.0",
+                "method": "supplier.create",
+                "params": {"name": f"Batch Supplier {unique_suffix}"},
+                "id": 1
+            },
+            {
+                "jsonrpc": "2.0",
+                "method": "material.delete",
+                "params": {"id": "x"},
+                "id": 2
+            },
+        ]
+        
+        response = self.url_open(
+            '/api/batch',
+            data=json.dumps(calls),
+            headers={'Content-Type': 'application/json-batch'}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode())
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]['error']['data']['error_code'], 409)
+        self.assertEqual(data[1]['error']['data']['error_code'], 400)
+        self.assertFalse(self.env['material.supplier'].search([('name', '=', f"Batch Supplier {unique_suffix}")]))
+
+    def test_batch_update_constraint_on_failing_call(self):
+        """Test POST /api/batch reports a unique code violation on the update that caused it"""
+        unique_suffix = str(int(time.time() * 1000))[-6:]
+        other = self.env['material.material'].create({
+            'material_code': f"DUP{unique_suffix}",
+            'material_name': 'Duplicate Target',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        })
+        calls = [
+            {
+                "jsonrpc": "2.0",
+                "method": "material.update",
+                "params": {"id": self.material.id, "material_code": other.material_code},
+                "id": 1
+            },
+            {
+                "jsonrpc": "2.0",
+                "method": "supplier.create",
+                "params": {"name": f"After Duplicate {unique_suffix}"},
+                "id": 2
+            },
+        ]
+        
+        response = self.url_open(
+            '/api/batch',
+            data=json.dumps(calls),
+            headers={'Content-Type': 'application/json-batch'}
+        )
+        
+        data = json.loads(response.content.decode())
+        self.assertEqual(data[0]['error']['data']['error_code'], 400)
+        self.assertEqual(data[1]['error']['data']['error_code'], 409)
+
+    def test_batch_rejects_json_rpc_content_type(self):
+        """Test POST /api/batch only accepts its own content type"""
+        calls = [{"jsonrpc": "2.0", "method": "supplier.create", "params": {"name": "Wrong Type"}, "id": 1}]
+        
+        for content_type in ('application/x-www-form-urlencoded', 'text/plain'):
+            response = self.url_open(
+                '/api/batch',
+                data=json.dumps(calls),
+                headers={'Content-Type': content_type}
+            )
+            self.assertEqual(response.status_code, 415)
+        self.assertFalse(self.env['material.supplier'].search([('name', '=', 'Wrong Type')]))
+
+    def test_create_material_idempotency_key(self):
+        """Test POST /api/materials replays the stored response for a repeated Idempotency-Key"""
+        unique_suffix = str(int(time.time() * 1000))[-6:]
+        
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {
+                "material_code": f"IDM{unique_suffix}",
+                "material_name": "Idempotent Material",
+                "material_type": "fabric",
+                "material_buy_price": 180.0,
+                "supplier_id": self.supplier.id
+            },
+            "id": None
+        }
+        headers = {
+            'Content-Type': 'application/json',
+            'Idempotency-Key': f'create-{unique_suffix}',
+        }
+        
+        first = self.url_open('/api/materials', data=json.dumps(payload), headers=headers)
+        second = self.url_open('/api/materials', data=json.dumps(payload), headers=headers)
+        
+        first_result = json.loads(first.content.decode())['result']
+        second_result = json.loads(second.content.decode())['result']
+        self.assertTrue(first_result.get('success'))
+        self.assertEqual(first_result, second_result)
+        self.assertEqual(
+            self.env['material.material'].search_count([('material_code', '=', f"IDM{unique_suffix}")]), 1
+        )
+        
+        # Reusing the key with a different payload is rejected
+        payload['params']['material_name'] = "Other Material"
+        third = self.url_open('/api/materials', data=json.dumps(payload), headers=headers)
+        third_result = json.loads(third.content.decode())['result']
+        self.assertFalse(third_result.get('success'))
+        self.assertEqual(third_result.get('error_code'), 422)
+
+    def test_lookup_materials_by_code(self):
+        """Test POST /api/materials/lookup keeps request order and reports missing codes"""
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {
+                "codes": ["DOES-NOT-EXIST", self.material.material_code],
+                "fields": ["id", "material_code"]
+            },
+            "id": None
+        }
+        
+        response = self.url_open(
+            '/api/materials/lookup',
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json'}
+        )
+        
+        result = json.loads(response.content.decode())['result']
+        self.assertTrue(result.get('success'))
+        self.assertEqual(result['data'][0], {'material_code': 'DOES-NOT-EXIST', 'found': False})
+        self.assertTrue(result['data'][1]['found'])
+        self.assertEqual(result['data'][1]['data'], {
+            'id': self.material.id,
+            'material_code': self.material.material_code,
+        })
+
+    def test_bulk_price_requires_filter(self):
+        """Test POST /api/materials/bulk_price refuses to reprice the whole catalog implicitly"""
+        def bulk_price(params):
+            payload = {"jsonrpc": "2.0", "method": "call", "params": params, "id": None}
+            response = self.url_open(
+                '/api/materials/bulk_price',
+                data=json.dumps(payload),
+                headers={'Content-Type': 'application/json'}
+            )
+            return json.loads(response.content.decode())['result']
+        
+        self.assertEqual(bulk_price({"percent": 10}).get('error_code'), 400)
+        self.assertEqual(bulk_price({"supplierid": self.supplier.id, "percent": 10}).get('error_code'), 400)
+        self.assertEqual(bulk_price({"material_ids": [], "percent": 10}).get('error_code'), 400)
+        self.assertEqual(bulk_price({"material_ids": [self.material.id], "percent": "ten"}).get('error_code'), 400)
+        self.assertEqual(bulk_price({"material_ids": [self.material.id]}).get('error_code'), 400)
+        self.material.invalidate_cache()
+        self.assertEqual(self.material.material_buy_price, 150.0)
+        
+        result = bulk_price({"all": True, "percent": 10, "dry_run": True})
+        self.assertTrue(result.get('success'))
+        self.assertGreaterEqual(result['data']['matched'], 1)
+
+    def test_rate_limited_json_route_status(self):
+        """Test JSON-RPC routes answer rate limited requests with HTTP 429 and Retry-After"""
+        params = self.env['ir.config_parameter'].sudo()
+        params.set_param('material_management.rate_limit.capacity', 1)
+        params.set_param('material_management.rate_limit.per_second', 0.001)
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"codes": [self.material.material_code]},
+            "id": None
+        }
+        
+        def lookup():
+            return self.url_open(
+                '/api/materials/lookup',
+                data=json.dumps(payload),
+                headers={'Content-Type': 'application/json'}
+            )
+        
+        self.assertEqual(lookup().status_code, 200)
+        response = lookup()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response.headers['Retry-After']), 0)
+        self.assertEqual(json.loads(response.content.decode())['result']['error_code'], 429)
+
+    def test_batch_generates_material_codes(self):
+        """Test POST /api/batch allocates codes for material creations without one"""
+        calls = [
+            {
+                "jsonrpc": "2.0",
+                "method": "material.create",
+                "params": {
+                    "material_name": "Generated Batch Material %s" % i,
+                    "material_type": "jeans",
+                    "material_buy_price": 300.0,
+                    "supplier_id": self.supplier.id
+                },
+                "id": i
+            }
+            for i in range(3)
+        ]
+        
+        response = self.url_open(
+            '/api/batch',
+            data=json.dumps(calls),
+            headers={'Content-Type': 'application/json-batch'}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode())
+        codes = [entry['result']['data']['material_code'] for entry in data]
+        self.assertEqual(len(set(codes)), 3)
+        self.assertTrue(all(code.startswith('JNS') for code in codes))
+
+    def test_onboard_supplier_with_materials(self):
+        """Test POST /api/suppliers/onboard creates the supplier and its materials together"""
+        unique_suffix = str(int(time.time() * 1000))[-6:]
+        
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {
+                "name": f"Onboarded Supplier {unique_suffix}",
+                "email": "onboard@supplier.com",
+                "materials": [
+                    {
+                        "material_name": "Onboarded Material %s" % i,
+                        "material_type": "cotton",
+                        "material_buy_price": 120.0 + i
+                    }
+                    for i in range(5)
+                ]
+            },
+            "id": None
+        }
+        
+        response = self.url_open(
+            '/api/suppliers/onboard',
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json'}
+        )
+        
+        result = json.loads(response.content.decode())['result']
+        self.assertTrue(result.get('success'))
+        supplier = self.env['material.supplier'].browse(result['data']['supplier']['id'])
+        materials = self.env['material.material'].browse([item['id'] for item in result['data']['materials']])
+        self.assertEqual(len(materials), 5)
+        self.assertEqual(materials.mapped('supplier_id'), supplier)
+        self.assertEqual(materials.mapped('material_buy_price'), [120.0, 121.0, 122.0, 123.0, 124.0])
+
+    def test_onboard_supplier_rolls_back_on_invalid_material(self):
+        """Test POST /api/suppliers/onboard creates nothing when one material is invalid"""
+        unique_suffix = str(int(time.time() * 1000))[-6:]
+        
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {
+                "name": f"Rejected Supplier {unique_suffix}",
+                "materials": [
+                    {"material_name": "Valid", "material_type": "fabric", "material_buy_price": 150.0},
+                    {"material_name": "Too Cheap", "material_type": "fabric", "material_buy_price": 50.0}
+                ]
+            },
+            "id": None
+        }
+        
+        response = self.url_open(
+            '/api/suppliers/onboard',
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json'}
+        )
+        
+        result = json.loads(response.content.decode())['result']
+        self.assertFalse(result.get('success'))
+        self.assertEqual(result.get('error_code'), 400)
+        self.assertFalse(self.env['material.supplier'].search([('name', '=', f"Rejected Supplier {unique_suffix}")]))
+
+    def test_api_key_auth(self):
+        """Test API key mode requires a key with the route's scopes"""
+        self.env['ir.config_parameter'].sudo().set_param('material_management.api_auth', 'api_key')
+        api_key = self.env['material.api.key'].create({
+            'name': 'Read Only Client',
+            'user_id': self.env.ref('base.user_admin').id,
+            'scopes': 'materials:read',
+        })
+        key = api_key._generate_key()[api_key.id]
+        
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"codes": [self.material.material_code]},
+            "id": None
+        }
+        
+        def lookup(headers):
+            response = self.url_open(
+                '/api/materials/lookup',
+                data=json.dumps(payload),
+                headers=dict(headers, **{'Content-Type': 'application/json'})
+            )
+            return json.loads(response.content.decode())['result']
+        
+        self.assertEqual(lookup({}).get('error_code'), 401)
+        self.assertEqual(lookup({'X-API-Key': key + 'x'}).get('error_code'), 401)
+        self.assertTrue(lookup({'X-API-Key': key}).get('success'))
+        self.assertTrue(lookup({'Authorization': 'Bearer %s' % key}).get('success'))
+        
+        payload["params"] = {"material_ids": [self.material.id], "percent": 10}
+        response = self.url_open(
+            '/api/materials/bulk_price',
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json', 'X-API-Key': key}
+        )
+        self.assertEqual(json.loads(response.content.decode())['result'].get('error_code'), 403)
+        
+        self.assertEqual(self.url_open('/api/snapshots').status_code, 401)
+        response = self.url_open('/api/snapshots', headers={'X-API-Key': key})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('suppliers', json.loads(response.content.decode())['data'])
+        self.assertEqual(self.url_open('/api/snapshots/suppliers', headers={'X-API-Key': key}).status_code, 403)
+
+    def test_get_suppliers_pages(self):
+        """Test GET /api/suppliers lists every supplier unless a page is requested"""
+        self.env['material.supplier'].create([{'name': 'Listing Supplier %s' % i} for i in range(3)])
+        self.env['ir.config_parameter'].sudo().set_param('material_management.supplier_page_size', 2)
+        total = self.env['material.supplier'].search_count([])
+        
+        data = json.loads(self.url_open('/api/suppliers').content.decode())
+        self.assertEqual(data['count'], total)
+        self.assertIsNone(data['next_cursor'])
+        
+        names, cursor = [], None
+        while True:
+            url = '/api/suppliers?limit=2' + ('&cursor=%s' % cursor if cursor else '')
+            data = json.loads(self.url_open(url).content.decode())
+            self.assertLessEqual(data['count'], 2)
+            names += [supplier['name'] for supplier in data['data']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(names), total)
+        self.assertEqual(self.url_open('/api/suppliers?cursor=bm90IGpzb24=').status_code, 400)
+
+    def test_public_scopes(self):
+        """Test requests without a key are limited to the public scopes"""
+        self.env['ir.config_parameter'].sudo().set_param('material_management.public_scopes', 'materials:read')
+        
+        response = self.url_open('/api/materials')
+        self.assertEqual(response.status_code, 200)
+        
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"material_ids": [self.material.id], "percent": 10},
+            "id": None
+        }
+        response = self.url_open(
+            '/api/materials/bulk_price',
+            data=json.dumps(payload),
+            headers={'Content-Type': 'application/json'}
+        )
+        self.assertEqual(json.loads(response.content.decode())['result'].get('error_code'), 401)
+        self.assertEqual(self.url_open('/api/snapshots/suppliers').status_code, 401)
+
     def tearDown(self):
         """Clean up test data"""
         # Clean up is handled by Odoo test framework automatically
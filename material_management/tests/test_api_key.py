@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+from odoo.exceptions import ValidationError
+
+
+class TestApiKey(TransactionCase):
+
+    def setUp(self):
+        super(TestApiKey, self).setUp()
+        self.ApiKey = self.env['material.api.key']
+        self.api_key = self.ApiKey.create({
+            'name': 'Test Client',
+            'user_id': self.env.ref('base.user_admin').id,
+            'scopes': 'materials:read materials:write',
+        })
+        self.key = self.api_key._generate_key()[self.api_key.id]
+
+    def test_resolve_key(self):
+        """Test a key resolves to its user and scopes, and only its hash is stored"""
+        key_id, user_id, scopes = self.ApiKey._resolve(self.key)
+        self.assertEqual(key_id, self.api_key.id)
+        self.assertEqual(user_id, self.env.ref('base.user_admin').id)
+        self.assertEqual(scopes, {'materials:read', 'materials:write'})
+        self.assertNotIn(self.key, (self.api_key.key_hash, self.api_key.key_prefix))
+        self.assertTrue(self.key.startswith(self.api_key.key_prefix))
+        self.assertIsNone(self.ApiKey._resolve(self.key + 'x'))
+
+    def test_resolve_is_cached(self):
+        """Test repeated resolutions of a key run no query"""
+        self.ApiKey._resolve(self.key)
+        before = self.env.cr.sql_log_count
+        self.ApiKey._resolve(self.key)
+        self.assertEqual(self.env.cr.sql_log_count, before)
+
+    def test_revoke_invalidates_cache(self):
+        """Test archived, rescoped and regenerated keys take effect immediately"""
+        self.ApiKey._resolve(self.key)
+        self.api_key.write({'scopes': 'materials:read'})
+        self.assertEqual(self.ApiKey._resolve(self.key)[2], {'materials:read'})
+        
+        new_key = self.api_key._generate_key()[self.api_key.id]
+        self.assertIsNone(self.ApiKey._resolve(self.key))
+        self.assertTrue(self.ApiKey._resolve(new_key))
+        
+        self.api_key.action_archive()
+        self.assertIsNone(self.ApiKey._resolve(new_key))
+
+    def test_unknown_scope(self):
+        """Test unknown scopes are rejected"""
+        with self.assertRaises(ValidationError):
+            self.api_key.write({'scopes': 'materials:read everything'})
+
+    def test_generated_key_is_not_stored(self):
+        """Test a generated key is shown through the action context only"""
+        action = self.api_key.action_generate_key()
+        key = action['context']['default_key']
+        self.assertEqual(self.ApiKey._resolve(key)[0], self.api_key.id)
+        self.assertNotIn('res_id', action)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import time
+import zlib
+
+import psycopg2
+
+from odoo.tests.common import TransactionCase
+
+
+class TestApiThrottle(TransactionCase):
+
+    def setUp(self):
+        super(TestApiThrottle, self).setUp()
+        self.Throttle = self.env['material.api.throttle']
+        self.params = self.env['ir.config_parameter'].sudo()
+
+    def test_rate_limit_disabled_by_default(self):
+        """Test requests are never rate limited without a configured capacity"""
+        for _i in range(20):
+            self.Throttle._consume_token('test:disabled')
+            self.assertEqual(self.Throttle._check_rate('test:disabled'), 0)
+
+    def test_token_bucket(self):
+        """Test a client is limited once its bucket is empty"""
+        self.params.set_param('material_management.rate_limit.capacity', 3)
+        self.params.set_param('material_management.rate_limit.per_second', 0.01)
+        client_key = 'test:%s' % time.time()
+        
+        for _i in range(3):
+            self.assertEqual(self.Throttle._check_rate(client_key), 0)
+            self.Throttle._consume_token(client_key)
+        retry_after = self.Throttle._check_rate(client_key)
+        self.assertGreater(retry_after, 0)
+        self.assertEqual(self.Throttle._admit('test_route', client_key), (429, retry_after))
+        
+        # Other clients have their own bucket
+        self.assertEqual(self.Throttle._check_rate(client_key + ':other'), 0)
+        
+        # Buckets are written in the request transaction, not committed on the side
+        with self.registry.cursor() as other_cr:
+            other_cr.execute("SELECT 1 FROM material_api_rate_bucket WHERE client_key = %s", (client_key,))
+            self.assertFalse(other_cr.fetchone())
+
+    def test_token_charged_when_transaction_aborted(self):
+        """Test a request whose transaction failed still pays its token, in its own transaction"""
+        self.params.set_param('material_management.rate_limit.capacity', 3)
+        self.params.set_param('material_management.rate_limit.per_second', 0.01)
+        client_key = 'test:aborted:%s' % time.time()
+        self.addCleanup(self._delete_bucket, client_key)
+        self.assertIsNone(self.Throttle._admit('test_route', client_key))
+        
+        with self.assertRaises(psycopg2.Error), self.env.cr.savepoint():
+            try:
+                self.env.cr.execute("SELECT 1 / 0")
+            except psycopg2.Error:
+                self.Throttle._consume_token(client_key)
+                raise
+        
+        with self.registry.cursor() as other_cr:
+            other_cr.execute("SELECT tokens FROM material_api_rate_bucket WHERE client_key = %s", (client_key,))
+            self.assertLess(other_cr.fetchone()[0], 3)
+
+    def _delete_bucket(self, client_key):
+        with self.registry.cursor() as cr:
+            cr.execute("DELETE FROM material_api_rate_bucket WHERE client_key = %s", (client_key,))
+
+    def test_concurrency_slots(self):
+        """Test a route is rejected with 503 when all its slots are held by other requests"""
+        self.params.set_param('material_management.throttle.test_route.max_concurrency', 1)
+        route_key = zlib.crc32(b'material_api:test_route') & 0x7fffffff
+        
+        with self.registry.cursor() as other_cr:
+            # Another request holds the only slot
+            other_cr.execute("SELECT pg_try_advisory_xact_lock(%s, 1)", (route_key,))
+            self.assertTrue(other_cr.fetchone()[0])
+            self.assertEqual(self.Throttle._admit('test_route', 'test:slots'), (503, 1))
+            other_cr.rollback()
+        
+        # Once released, the slot is taken for the rest of this transaction
+        self.assertIsNone(self.Throttle._admit('test_route', 'test:slots'))
+        with self.registry.cursor() as other_cr:
+            other_cr.execute("SELECT pg_try_advisory_xact_lock(%s, 1)", (route_key,))
+            self.assertFalse(other_cr.fetchone()[0])
+            other_cr.rollback()
+
+    def test_statement_timeout(self):
+        """Test the route's statement timeout is applied to the transaction"""
+        self.params.set_param('material_management.throttle.get_material.statement_timeout_ms', 1234)
+        self.Throttle._admit('get_material', 'test:timeout')
+        self.env.cr.execute("SHOW statement_timeout")
+        self.assertEqual(self.env.cr.fetchone()[0], '1234ms')
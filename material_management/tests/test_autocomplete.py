@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+from ..models.autocomplete import PrefixIndex
+
+
+class TestAutocomplete(TransactionCase):
+
+    def setUp(self):
+        super(TestAutocomplete, self).setUp()
+        
+        self.supplier = self.env['material.supplier'].create({
+            'name': 'Autocomplete Supplier'
+        })
+        self.denim = self.env['material.material'].create({
+            'material_code': 'ACDNM01',
+            'material_name': 'Stretch Denim',
+            'material_type': 'jeans',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        })
+
+    def test_prefix_index_search(self):
+        """Test prefix matching on full texts and on individual words"""
+        index = PrefixIndex(1, [
+            (1, ('B', 1), 'Blue Denim', ('Blue Denim',)),
+            (2, ('A', 2), 'Denim Stretch', ('Denim Stretch',)),
+            (3, ('C', 3), 'Cotton', ('Cotton',)),
+        ])
+        
+        self.assertEqual(index.search('den'), [(2, 'Denim Stretch'), (1, 'Blue Denim')])
+        self.assertEqual(index.search('DEN', limit=1), [(2, 'Denim Stretch')])
+        self.assertEqual(index.search('cot'), [(3, 'Cotton')])
+        self.assertEqual(index.search('xyz'), [])
+        self.assertEqual(index.search('den', words=False), [(2, 'Denim Stretch')])
+
+    def test_material_name_search_uses_index(self):
+        """Test prefix name_search is answered from the index and sees new records"""
+        Material = self.env['material.material']
+        
+        # Cold index: first call falls back to SQL and warms the index
+        self.assertIn(self.denim.id, [r[0] for r in Material.name_search('ACDNM%', operator='=ilike')])
+        self.assertEqual(Material._autocomplete_search('acdnm', 10), [(self.denim.id, '[ACDNM01] Stretch Denim')])
+        
+        # Creating a material invalidates the index
+        cotton = Material.create({
+            'material_code': 'ACCTN01',
+            'material_name': 'Organic Cotton',
+            'material_type': 'cotton',
+            'material_buy_price': 120.0,
+            'supplier_id': self.supplier.id
+        })
+        Material.name_search('organic%', operator='=ilike')
+        self.assertEqual(Material._autocomplete_search('organic', 10), [(cotton.id, '[ACCTN01] Organic Cotton')])
+        self.assertEqual(Material.name_search('organic%', operator='=ilike'), [(cotton.id, '[ACCTN01] Organic Cotton')])
+        
+        # Archived materials leave the index
+        cotton.action_archive()
+        Material.name_search('organic%', operator='=ilike')
+        self.assertEqual(Material._autocomplete_search('organic', 10), [])
+
+    def test_name_search_same_results_cold_and_warm(self):
+        """Test ilike keeps substring semantics whether or not the index is warm"""
+        Material = self.env['material.material']
+        cold = Material.name_search('retch')
+        Material._autocomplete_build()
+        self.assertEqual(Material.name_search('retch'), cold)
+        self.assertIn(self.denim.id, [r[0] for r in cold])
+        
+        # '=ilike' prefixes only match full texts, not words
+        self.assertNotIn(self.denim.id, [r[0] for r in Material.name_search('denim%', operator='=ilike')])
+
+    def test_sql_fallback_matches_index(self):
+        """Test the cold SQL fallback of the autocomplete route returns what the index returns"""
+        for Model, prefix in [(self.env['material.material'], 'acdn'), (self.env['material.material'], 'stretch'),
+                              (self.env['material.supplier'], 'autocomplete sup')]:
+            Model._autocomplete_build()
+            self.assertEqual(Model._autocomplete_sql_search(prefix, 10), Model._autocomplete_search(prefix, 10))
+            self.assertTrue(Model._autocomplete_sql_search(prefix, 10))
+
+    def test_supplier_name_search_uses_index(self):
+        """Test supplier name_search returns the same results through the index"""
+        Supplier = self.env['material.supplier']
+        Supplier.name_search('autocomplete%', operator='=ilike')
+        self.assertEqual(Supplier._autocomplete_search('autocomplete', 10), [(self.supplier.id, 'Autocomplete Supplier')])
+        self.assertEqual(Supplier.name_search('autocomplete%', operator='=ilike'), [(self.supplier.id, 'Autocomplete Supplier')])
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+from ..models import catalog_snapshot
+
+
+class TestCatalogSnapshot(TransactionCase):
+
+    def setUp(self):
+        super(TestCatalogSnapshot, self).setUp()
+        
+        # Write snapshots to a throwaway directory instead of the real filestore
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = patch.object(catalog_snapshot, 'snapshot_dir', lambda dbname: self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.supplier = self.env['material.supplier'].create({
+            'name': 'Snapshot Supplier'
+        })
+        self.material = self.env['material.material'].create({
+            'material_code': 'SNP001',
+            'material_name': 'Snapshot Material',
+            'material_type': 'cotton',
+            'material_buy_price': 125.0,
+            'supplier_id': self.supplier.id
+        })
+        self.material.flush()
+
+    def _read_snapshot(self, entry):
+        with gzip.open(os.path.join(self.directory, entry['files']['json.gz']), 'rt') as snapshot:
+            return json.load(snapshot)
+
+    def test_generate_snapshots(self):
+        """Test snapshots contain active records and are published in the manifest"""
+        manifest = self.env['material.catalog.snapshot'].generate_snapshots()
+        
+        self.assertEqual(set(manifest), {'materials', 'suppliers'})
+        self.assertEqual(catalog_snapshot.read_manifest(self.env.cr.dbname), manifest)
+        
+        materials = self._read_snapshot(manifest['materials'])
+        self.assertEqual(len(materials), manifest['materials']['count'])
+        row = next(row for row in materials if row['id'] == self.material.id)
+        self.assertEqual(row['material_code'], 'SNP001')
+        self.assertEqual(row['supplier_name'], 'Snapshot Supplier')
+
+    def test_unchanged_catalog_is_not_rewritten(self):
+        """Test a new snapshot is only written when the content changed"""
+        Snapshot = self.env['material.catalog.snapshot']
+        first = Snapshot.generate_snapshots()['materials']
+        self.assertEqual(Snapshot.generate_snapshots()['materials'], first)
+        
+        self.material.write({'material_name': 'Renamed Snapshot Material'})
+        self.material.flush()
+        second = Snapshot.generate_snapshots()['materials']
+        self.assertNotEqual(second['version'], first['version'])
+        row = next(row for row in self._read_snapshot(second) if row['id'] == self.material.id)
+        self.assertEqual(row['material_name'], 'Renamed Snapshot Material')
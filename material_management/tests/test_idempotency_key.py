@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestIdempotencyKey(TransactionCase):
+
+    def setUp(self):
+        super(TestIdempotencyKey, self).setUp()
+        self.Store = self.env['material.idempotency.key']
+
+    def test_reserve_key(self):
+        """Test a key is created once and found on the second reservation"""
+        request_hash = self.Store._hash_request({'name': 'ACME'})
+        
+        entry, created = self.Store._reserve('key-1', 'POST /api/suppliers', 'user:1', request_hash)
+        self.assertTrue(created)
+        
+        same_entry, created = self.Store._reserve('key-1', 'POST /api/suppliers', 'user:1', request_hash)
+        self.assertFalse(created)
+        self.assertEqual(same_entry, entry)
+        
+        # The same key on another endpoint is independent
+        other_entry, created = self.Store._reserve('key-1', 'POST /api/materials', 'user:1', request_hash)
+        self.assertTrue(created)
+        self.assertNotEqual(other_entry, entry)
+        
+        # So is the same key sent by another client
+        other_entry, created = self.Store._reserve('key-1', 'POST /api/suppliers', 'key:7', request_hash)
+        self.assertTrue(created)
+        self.assertNotEqual(other_entry, entry)
+
+    def test_store_and_replay_response(self):
+        """Test the stored response is returned unchanged"""
+        entry, created = self.Store._reserve('key-2', 'POST /api/suppliers', 'user:1', 'hash')
+        response = {'success': True, 'data': {'id': 1, 'name': 'ACME'}}
+        entry._store_response(response)
+        self.assertEqual(entry._get_response(), response)
+
+    def test_hash_request_is_stable(self):
+        """Test payload hashing does not depend on key order"""
+        self.assertEqual(
+            self.Store._hash_request({'a': 1, 'b': 2}),
+            self.Store._hash_request({'b': 2, 'a': 1})
+        )
+
+    def test_gc_expired_keys(self):
+        """Test the cron purges expired keys only"""
+        expired, created = self.Store._reserve('key-3', 'POST /api/suppliers', 'user:1', 'hash')
+        valid, created = self.Store._reserve('key-4', 'POST /api/suppliers', 'user:1', 'hash')
+        expired.write({'expires_at': fields.Datetime.now() - timedelta(hours=1)})
+        expired.flush()
+        
+        self.Store._gc_expired_keys()
+        
+        self.assertFalse(self.Store.browse(expired.id).exists())
+        self.assertTrue(valid.exists())
@@ -214,4 +214,229 @@ class TestMaterial(TransactionCase):
         jeans_materials = self.env['material.material'].search([('material_type', '=', 'jeans')])
         self.assertIn(jeans_material, jeans_materials)
         self.assertNotIn(fabric_material, jeans_materials)
-        self.assertNotIn(cotton_material, jeans_materials) 
\ No newline at end of file
+        self.assertNotIn(cotton_material, jeans_materials) 
+
+    def test_material_archive(self):
+        """Test archived materials are hidden from search but keep their code reserved"""
+        material = self.env['material.material'].create({
+            'material_code': 'ARC001',
+            'material_name': 'Archived Material',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        })
+        
+        material.action_archive()
+        self.assertFalse(material.active)
+        
+        # Archived material is excluded from default search
+        materials = self.env['material.material'].search([('material_code', '=', 'ARC001')])
+        self.assertNotIn(material, materials)
+        
+        # But still reachable with active_test disabled
+        materials = self.env['material.material'].with_context(active_test=False).search([('material_code', '=', 'ARC001')])
+        self.assertIn(material, materials)
+        
+        # Code uniqueness still holds across archived materials
+        from psycopg2.errors import UniqueViolation
+        with self.assertRaises(UniqueViolation):
+            with self.env.cr.savepoint():
+                self.env['material.material'].create({
+                    'material_code': 'ARC001',
+                    'material_name': 'Reused Code Material',
+                    'material_type': 'fabric',
+                    'material_buy_price': 150.0,
+                    'supplier_id': self.supplier.id
+                })
+        
+        material.action_unarchive()
+        self.assertTrue(material.active)
+
+    def test_material_version_conflict(self):
+        """Test optimistic concurrency control on material writes"""
+        material = self.env['material.material'].create({
+            'material_code': 'VER001',
+            'material_name': 'Versioned Material',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        })
+        self.assertEqual(material.version, 1)
+        
+        # Every write bumps the version
+        material.write({'material_buy_price': 160.0})
+        self.assertEqual(material.version, 2)
+        
+        # Writing with the current version succeeds
+        self.assertTrue(material.write_if_version(2, {'material_buy_price': 170.0}))
+        self.assertEqual(material.version, 3)
+        self.assertEqual(material.material_buy_price, 170.0)
+        
+        # Writing with a stale version is rejected and changes nothing
+        self.assertFalse(material.write_if_version(2, {'material_buy_price': 180.0}))
+        self.assertEqual(material.version, 3)
+        self.assertEqual(material.material_buy_price, 170.0)
+        
+        # A write rejected by a constraint does not bump the version
+        with self.assertRaises(ValidationError):
+            material.write_if_version(3, {'material_buy_price': 50.0})
+        self.assertEqual(material.version, 3)
+        self.assertEqual(material.material_buy_price, 170.0)
+
+    def test_material_bulk_adjust_price(self):
+        """Test set-based price adjustment for a supplier's materials"""
+        other_supplier = self.env['material.supplier'].create({'name': 'Other Bulk Supplier'})
+        Material = self.env['material.material']
+        first = Material.create({
+            'material_code': 'BLK001',
+            'material_name': 'Bulk Material 1',
+            'material_type': 'fabric',
+            'material_buy_price': 100.0,
+            'supplier_id': self.supplier.id
+        })
+        second = Material.create({
+            'material_code': 'BLK002',
+            'material_name': 'Bulk Material 2',
+            'material_type': 'jeans',
+            'material_buy_price': 200.0,
+            'supplier_id': self.supplier.id
+        })
+        untouched = Material.create({
+            'material_code': 'BLK003',
+            'material_name': 'Bulk Material 3',
+            'material_type': 'fabric',
+            'material_buy_price': 300.0,
+            'supplier_id': other_supplier.id
+        })
+        domain = [('supplier_id', '=', self.supplier.id)]
+        
+        # Dry run reports without writing
+        result = Material.bulk_adjust_price(domain, percent=10, dry_run=True)
+        self.assertEqual(result['matched'], 2)
+        self.assertEqual(result['updated'], 0)
+        self.assertEqual(first.material_buy_price, 100.0)
+        
+        result = Material.bulk_adjust_price(domain, percent=10)
+        self.assertEqual(result['updated'], 2)
+        self.assertEqual(first.material_buy_price, 110.0)
+        self.assertEqual(second.material_buy_price, 220.0)
+        self.assertEqual(second.version, 2)
+        self.assertEqual(untouched.material_buy_price, 300.0)
+        
+        # Violations of the minimum price abort the whole adjustment
+        result = Material.bulk_adjust_price(domain, amount=-50)
+        self.assertEqual(result['updated'], 0)
+        self.assertEqual([v['id'] for v in result['violations']], [first.id])
+        self.assertEqual(first.material_buy_price, 110.0)
+        self.assertEqual(second.material_buy_price, 220.0)
+        
+        with self.assertRaises(ValidationError):
+            Material.bulk_adjust_price(domain, percent=10, amount=5)
+
+    def test_material_lookup(self):
+        """Test batch lookup of materials by code and by ID"""
+        Material = self.env['material.material']
+        first = Material.create({
+            'material_code': 'LKP001',
+            'material_name': 'Lookup Material 1',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        })
+        archived = Material.create({
+            'material_code': 'LKP002',
+            'material_name': 'Lookup Material 2',
+            'material_type': 'cotton',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        })
+        archived.action_archive()
+        
+        found = Material._lookup('material_code', ['LKP002', 'LKP001', 'MISSING'])
+        self.assertEqual(found, {'LKP001': first})
+        
+        found = Material._lookup('material_code', ['LKP001', 'LKP002'], include_archived=True)
+        self.assertEqual(found, {'LKP001': first, 'LKP002': archived})
+        
+        found = Material._lookup('id', [archived.id, first.id], include_archived=True)
+        self.assertEqual(found, {first.id: first, archived.id: archived})
+
+    def test_material_constraints_query_count(self):
+        """Test constraint validation cost does not grow with the number of records"""
+        other_supplier = self.env['material.supplier'].create({'name': 'Second Constraint Supplier'})
+        suppliers = [self.supplier, other_supplier]
+        
+        def create(count, prefix):
+            return self.env['material.material'].create([{
+                'material_code': '%s%04d' % (prefix, i),
+                'material_name': 'Constraint Material %s' % i,
+                'material_type': 'fabric',
+                'material_buy_price': 150.0,
+                'supplier_id': suppliers[i % 2].id
+            } for i in range(count)])
+        
+        def count_validation_queries(materials):
+            materials.invalidate_cache()
+            before = self.env.cr.sql_log_count
+            materials._validate_fields(['material_buy_price', 'material_code', 'material_type', 'supplier_id'])
+            return self.env.cr.sql_log_count - before
+        
+        large = create(300, 'QCL')
+        self.assertEqual(count_validation_queries(create(10, 'QCS')), count_validation_queries(large))
+        
+        # With the records loaded, checking all suppliers is exactly one existence query
+        large.mapped('supplier_id')
+        before = self.env.cr.sql_log_count
+        large._check_supplier_id()
+        self.assertEqual(self.env.cr.sql_log_count - before, 1)
+
+    def test_create_material_generates_code(self):
+        """Test missing material codes are allocated from the sequence with a per-type prefix"""
+        self.env['ir.config_parameter'].sudo().set_param('material_management.code_prefix.cotton', 'CT-')
+        materials = self.env['material.material'].create([{
+            'material_name': 'Generated Code %s' % i,
+            'material_type': material_type,
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        } for i, material_type in enumerate(['fabric', 'fabric', 'cotton'])] + [{
+            'material_code': 'GEN001',
+            'material_name': 'Explicit Code',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        }])
+        
+        codes = materials.mapped('material_code')
+        self.assertRegex(codes[0], r'^FAB\d{6,}$')
+        self.assertRegex(codes[1], r'^FAB\d{6,}$')
+        self.assertNotEqual(codes[0], codes[1])
+        self.assertRegex(codes[2], r'^CT-\d{6,}$')
+        self.assertEqual(codes[3], 'GEN001')
+
+    def test_bulk_create_materials(self):
+        """Test bulk create inserts all rows and their price history in one statement"""
+        vals_list = [{
+            'material_name': 'Bulk Material %s' % i,
+            'material_type': 'fabric',
+            'material_buy_price': 100 + i,
+            'supplier_id': self.supplier.id
+        } for i in range(50)]
+        self.env['material.material'].flush()
+        before = self.env.cr.sql_log_count
+        materials = self.env['material.material']._bulk_create(vals_list)
+        queries = self.env.cr.sql_log_count - before
+        
+        self.assertEqual(materials.mapped('material_name'), [vals['material_name'] for vals in vals_list])
+        self.assertEqual(materials.mapped('material_buy_price'), [vals['material_buy_price'] for vals in vals_list])
+        self.assertTrue(all(code.startswith('FAB') for code in materials.mapped('material_code')))
+        self.assertTrue(all(materials.mapped('active')))
+        self.assertLess(queries, 15)
+        
+        self.env.cr.execute("SELECT COUNT(*) FROM material_price_history WHERE material_id IN %s", (tuple(materials.ids),))
+        self.assertEqual(self.env.cr.fetchone()[0], 50)
+        
+        # Constraints are still enforced on the inserted rows
+        with self.assertRaises(ValidationError), self.env.cr.savepoint():
+            self.env['material.material']._bulk_create([dict(vals_list[0], material_type='silk')])
+        with self.assertRaises(ValidationError):
+            self.env['material.material']._bulk_create([dict(vals_list[0], list_price=1)])
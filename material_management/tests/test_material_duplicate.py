@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestMaterialDuplicate(TransactionCase):
+
+    def setUp(self):
+        super(TestMaterialDuplicate, self).setUp()
+
+        self.env.cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if not self.env.cr.fetchone():
+            self.skipTest("pg_trgm is not installed")
+
+        self.Candidate = self.env['material.duplicate.candidate']
+        Supplier = self.env['material.supplier']
+        self.supplier = Supplier.create({'name': 'Duplicate Supplier'})
+        self.other_supplier = Supplier.create({'name': 'Other Duplicate Supplier'})
+        self.materials = self.env['material.material'].create([{
+            'material_code': code,
+            'material_name': name,
+            'material_type': material_type,
+            'material_buy_price': 150.0,
+            'supplier_id': supplier.id
+        } for code, name, material_type, supplier in [
+            ('DUP-001', 'Blue Denim Fabric 12oz', 'fabric', self.supplier),
+            ('DUP-001A', 'Blue Denim Fabric 12 oz', 'fabric', self.supplier),
+            ('DUP-002', 'White Cotton Twill', 'fabric', self.supplier),
+            ('DUP-003', 'Blue Denim Fabric 12oz', 'jeans', self.supplier),
+            ('DUP-004', 'Blue Denim Fabric 12oz', 'fabric', self.other_supplier),
+        ]])
+        self.materials.flush()
+
+    def _candidates(self):
+        return self.Candidate.search([('material_id', 'in', self.materials.ids)])
+
+    def test_detect_within_blocks(self):
+        """Test only similar materials of the same supplier and type are paired"""
+        run = self.Candidate.detect_duplicates()
+        candidates = self._candidates()
+        self.assertEqual(len(candidates), 1)
+        self.assertEqual(candidates.material_id, self.materials[0])
+        self.assertEqual(candidates.duplicate_id, self.materials[1])
+        self.assertEqual(candidates.state, 'pending')
+        self.assertGreaterEqual(candidates.score, run.min_score)
+        self.assertGreater(candidates.name_score, candidates.code_score)
+
+        self.assertEqual(candidates.run_id, run)
+        self.assertGreaterEqual(run.material_count, len(self.materials))
+        self.assertGreaterEqual(run.candidate_count, 1)
+
+    def test_rerun_keeps_reviewed_pairs(self):
+        """Test dismissed pairs stay dismissed and stale pending pairs are dropped"""
+        self.Candidate.detect_duplicates()
+        self._candidates().action_dismiss()
+        self.Candidate.detect_duplicates()
+        self.assertEqual(self._candidates().state, 'dismissed')
+
+        self._candidates().unlink()
+        self.Candidate.detect_duplicates()
+        self.assertEqual(self._candidates().state, 'pending')
+        self.materials[1].write({'material_name': 'Stretch Jersey Knit'})
+        self.materials.flush()
+        self.Candidate.detect_duplicates()
+        self.assertFalse(self._candidates())
+
+    def test_archive_duplicate(self):
+        """Test archiving the duplicate of a candidate pair"""
+        self.Candidate.detect_duplicates()
+        self._candidates().action_archive_duplicate()
+        self.assertEqual(self._candidates().state, 'merged')
+        self.assertFalse(self.materials[1].active)
+        self.assertTrue(self.materials[0].active)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestMaterialReport(TransactionCase):
+
+    def setUp(self):
+        super(TestMaterialReport, self).setUp()
+        
+        self.supplier = self.env['material.supplier'].create({
+            'name': 'Report Supplier'
+        })
+        Material = self.env['material.material']
+        self.cheap = Material.create({
+            'material_code': 'RPT001',
+            'material_name': 'Cheap Fabric',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id
+        })
+        self.expensive = Material.create({
+            'material_code': 'RPT002',
+            'material_name': 'Premium Jeans',
+            'material_type': 'jeans',
+            'material_buy_price': 6000.0,
+            'supplier_id': self.supplier.id
+        })
+        Material.flush()
+
+    def test_report_rows(self):
+        """Test the report pre-joins supplier data and price bands"""
+        rows = self.env['material.report'].search([('supplier_id', '=', self.supplier.id)])
+        self.assertEqual(rows.mapped('material_id'), self.cheap | self.expensive)
+        
+        cheap_row = rows.filtered(lambda r: r.material_id == self.cheap)
+        self.assertEqual(cheap_row.supplier_name, 'Report Supplier')
+        self.assertEqual(cheap_row.price_band, '100_499')
+        self.assertEqual(rows.filtered(lambda r: r.material_id == self.expensive).price_band, '5000_plus')
+
+    def test_report_group_by_supplier(self):
+        """Test aggregations over the report"""
+        groups = self.env['material.report'].read_group(
+            [('supplier_id', '=', self.supplier.id)],
+            ['material_count', 'total_buy_price'],
+            ['supplier_name']
+        )
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0]['material_count'], 2)
+        self.assertEqual(groups[0]['total_buy_price'], 6150.0)
+
+    def test_report_excludes_archived(self):
+        """Test archived materials are left out of the report"""
+        self.expensive.action_archive()
+        self.expensive.flush()
+        rows = self.env['material.report'].search([('supplier_id', '=', self.supplier.id)])
+        self.assertEqual(rows.mapped('material_id'), self.cheap)
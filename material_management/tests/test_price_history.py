@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date, datetime
+
+from odoo.tests.common import TransactionCase
+
+
+class TestPriceHistory(TransactionCase):
+
+    def setUp(self):
+        super(TestPriceHistory, self).setUp()
+
+        self.History = self.env['material.price.history']
+        self.supplier = self.env['material.supplier'].create({
+            'name': 'History Supplier'
+        })
+        self.material = self.env['material.material'].create({
+            'material_code': 'HIST001',
+            'material_name': 'History Fabric',
+            'material_type': 'fabric',
+            'material_buy_price': 200.0,
+            'supplier_id': self.supplier.id
+        })
+
+    def _history(self, material):
+        self.env.cr.execute("""
+            SELECT price, previous_price FROM material_price_history
+            WHERE material_id = %s ORDER BY changed_at, id
+        """, (material.id,))
+        return self.env.cr.fetchall()
+
+    def test_create_records_initial_price(self):
+        """Test creating a material records its initial price"""
+        self.assertEqual(self._history(self.material), [(200.0, None)])
+
+    def test_write_records_price_changes(self):
+        """Test only actual price changes are appended"""
+        self.material.write({'material_buy_price': 250.0})
+        self.material.write({'material_name': 'Renamed Fabric'})
+        self.material.write({'material_buy_price': 250.0})
+        self.assertEqual(self._history(self.material), [(200.0, None), (250.0, 200.0)])
+
+    def test_bulk_adjust_records_price_changes(self):
+        """Test bulk price adjustments are recorded in the same statement"""
+        self.env['material.material'].bulk_adjust_price([('id', '=', self.material.id)], percent=10)
+        self.assertEqual(self._history(self.material), [(200.0, None), (220.0, 200.0)])
+
+    def test_get_series(self):
+        """Test series by material and by supplier are limited to the date range"""
+        self.material.write({'material_buy_price': 300.0})
+        date_from, date_to = datetime(2000, 1, 1), datetime(2100, 1, 1)
+
+        series, next_key = self.History.get_series(date_from, date_to, material_id=self.material.id)
+        self.assertEqual([row['price'] for row in series], [200.0, 300.0])
+        self.assertEqual(series[1]['previous_price'], 200.0)
+        self.assertIsNone(next_key)
+
+        series, next_key = self.History.get_series(date_from, date_to, supplier_id=self.supplier.id)
+        self.assertEqual(len(series), 2)
+
+        series, next_key = self.History.get_series(date_from, datetime(2001, 1, 1), material_id=self.material.id)
+        self.assertFalse(series)
+
+    def test_get_series_pages(self):
+        """Test a series cut by the limit returns the key of the next page"""
+        self.material.write({'material_buy_price': 300.0})
+        self.material.write({'material_buy_price': 400.0})
+        date_from, date_to = datetime(2000, 1, 1), datetime(2100, 1, 1)
+
+        series, next_key = self.History.get_series(date_from, date_to, material_id=self.material.id, limit=2)
+        self.assertEqual([row['price'] for row in series], [200.0, 300.0])
+        self.assertTrue(next_key)
+        series, next_key = self.History.get_series(
+            date_from, date_to, material_id=self.material.id, limit=2, after=next_key)
+        self.assertEqual([row['price'] for row in series], [400.0])
+        self.assertIsNone(next_key)
+
+    def test_unlink_deletes_history(self):
+        """Test deleting a material deletes its price history"""
+        material_id = self.material.id
+        self.material.unlink()
+        self.env.cr.execute("SELECT count(*) FROM material_price_history WHERE material_id = %s", (material_id,))
+        self.assertEqual(self.env.cr.fetchone()[0], 0)
+
+    def test_get_prices_as_of(self):
+        """Test the as-of price is the latest change at or before the date"""
+        self.History._ensure_partitions(start=date(2020, 1, 1))
+        self.env.cr.execute("""
+            INSERT INTO material_price_history (material_id, supplier_id, price, changed_at)
+            VALUES (%(id)s, %(supplier)s, 100.0, '2020-01-15'), (%(id)s, %(supplier)s, 120.0, '2020-03-01')
+        """, {'id': self.material.id, 'supplier': self.supplier.id})
+
+        def price_as_of(as_of):
+            rows = self.History.get_prices_as_of(as_of, supplier_id=self.supplier.id)
+            return {row['material_id']: row['price'] for row in rows}.get(self.material.id)
+
+        self.assertIsNone(price_as_of(datetime(2020, 1, 1)))
+        self.assertEqual(price_as_of(datetime(2020, 2, 1)), 100.0)
+        self.assertEqual(price_as_of(datetime(2020, 3, 1)), 120.0)
+        self.assertEqual(price_as_of(datetime(2100, 1, 1)), 200.0)
+
+    def test_ensure_partitions(self):
+        """Test monthly partitions are created ahead of time"""
+        self.History._ensure_partitions(months_ahead=2)
+        self.env.cr.execute("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'material_price_history'::regclass
+        """)
+        partitions = {row[0] for row in self.env.cr.fetchall()}
+        today = date.today()
+        self.assertIn('material_price_history_y%sm%02d' % (today.year, today.month), partitions)
+        self.assertIn('material_price_history_default', partitions)
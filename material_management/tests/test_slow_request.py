@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+import psycopg2
+
+from odoo.modules.registry import Registry
+from odoo.tests.common import TransactionCase
+
+from ..models import slow_request
+
+
+class TestSlowRequest(TransactionCase):
+
+    def setUp(self):
+        super(TestSlowRequest, self).setUp()
+        self.SlowRequest = self.env['material.slow.request']
+        self.params = self.env['ir.config_parameter'].sudo()
+        self.params.set_param('material_management.slow_query.threshold_ms', 0.001)
+        self.params.set_param('material_management.slow_query.sample_rate', 1)
+        slow_request._last_capture.clear()
+        self.supplier = self.env['material.supplier'].create({'name': 'Slow Query Supplier'})
+
+    def _request_info(self):
+        return {'method': 'GET', 'path': '/api/test', 'params': {'q': 'slow'}, 'user_id': self.env.uid}
+
+    def _captured(self, route_name):
+        return self.SlowRequest.search([('route', '=', route_name)])
+
+    def test_capture_with_plans(self):
+        """Test slow requests are stored with their statements on the request cursor; only reads are analyzed"""
+        def call():
+            self.env.cr.execute("SELECT id FROM material_supplier WHERE name = %s", ('Slow Query Supplier',))
+            self.env.cr.execute("UPDATE material_supplier SET phone = %s WHERE id = %s", ('123', self.supplier.id))
+            return 'done'
+
+        self.env.cr.execute("SHOW statement_timeout")
+        statement_timeout = self.env.cr.fetchone()[0]
+        with patch.object(Registry, 'cursor', side_effect=AssertionError("capture opened a cursor")):
+            self.assertEqual(self.SlowRequest._monitor('test_capture', call, self._request_info), 'done')
+        self.env.cr.execute("SHOW statement_timeout")
+        self.assertEqual(self.env.cr.fetchone()[0], statement_timeout)
+        captured = self._captured('test_capture')
+        self.assertEqual(len(captured), 1)
+        self.assertTrue(captured.sampled)
+        self.assertIn('slow', captured.params)
+
+        statements = {statement.query.split()[0]: statement for statement in captured.statement_ids}
+        self.assertIn("'Slow Query Supplier'", statements['SELECT'].query)
+        self.assertTrue(statements['SELECT'].analyzed)
+        self.assertIn('actual time', statements['SELECT'].plan)
+        self.assertFalse(statements['UPDATE'].analyzed)
+        self.assertNotIn('actual time', statements['UPDATE'].plan)
+
+    def test_explain_budget(self):
+        """Test statements past the per-request explain budget are stored without a plan"""
+        self.params.set_param('material_management.slow_query.explain_budget_ms', 0)
+
+        def call():
+            self.env.cr.execute("SELECT id FROM material_supplier WHERE name = %s", ('Slow Query Supplier',))
+
+        self.SlowRequest._monitor('test_budget', call, self._request_info)
+        statement = self._captured('test_budget').statement_ids
+        self.assertEqual(len(statement), 1)
+        self.assertFalse(statement.analyzed)
+        self.assertIn('explain_budget_ms', statement.plan)
+
+    def test_timeout_recorded_on_separate_cursor(self):
+        """Test a timed out request is recorded from its own transaction, whatever its duration"""
+        self.params.set_param('material_management.slow_query.threshold_ms', 60000)
+        self.addCleanup(self._delete_captured, 'test_timeout')
+
+        def call():
+            self.env.cr.execute("SET LOCAL statement_timeout = 1")
+            self.env.cr.execute("SELECT pg_sleep(0.1)")
+
+        with self.assertRaises(psycopg2.extensions.QueryCanceledError), self.env.cr.savepoint():
+            self.SlowRequest._monitor('test_timeout', call, self._request_info)
+        with self.registry.cursor() as other_cr:
+            other_cr.execute("SELECT outcome FROM material_slow_request WHERE route = %s", ('test_timeout',))
+            self.assertEqual(other_cr.fetchall(), [('timeout',)])
+
+    def _delete_captured(self, route_name):
+        with self.registry.cursor() as cr:
+            cr.execute("DELETE FROM material_slow_request WHERE route = %s", (route_name,))
+
+    def test_capture_rate_limited(self):
+        """Test a route is captured at most once per interval"""
+        for _i in range(3):
+            self.SlowRequest._monitor('test_rate_limit', lambda: None, self._request_info)
+        self.assertEqual(len(self._captured('test_rate_limit')), 1)
+
+    def test_fast_requests_not_captured(self):
+        """Test requests under the threshold or with monitoring disabled are not recorded"""
+        self.params.set_param('material_management.slow_query.threshold_ms', 60000)
+        self.SlowRequest._monitor('test_fast', lambda: None, self._request_info)
+        self.params.set_param('material_management.slow_query.threshold_ms', 0)
+        self.SlowRequest._monitor('test_fast', lambda: None, self._request_info)
+        self.assertFalse(self._captured('test_fast'))
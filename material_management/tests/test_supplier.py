@@ -104,4 +104,63 @@ class TestSupplier(TransactionCase):
         self.assertEqual(supplier.name, 'Minimal Supplier')
         self.assertFalse(supplier.email)
         self.assertFalse(supplier.phone)
-        self.assertFalse(supplier.address) 
\ No newline at end of file
+        self.assertFalse(supplier.address) 
+
+    def test_supplier_archive(self):
+        """Test archived suppliers are hidden from search"""
+        supplier = self.env['material.supplier'].create({
+            'name': 'Archive Supplier'
+        })
+        
+        supplier.action_archive()
+        self.assertFalse(supplier.active)
+        self.assertNotIn(supplier, self.env['material.supplier'].search([]))
+        
+        supplier.action_unarchive()
+        self.assertTrue(supplier.active)
+        self.assertIn(supplier, self.env['material.supplier'].search([]))
+
+    def test_supplier_name_unique_ignores_case(self):
+        """Test supplier names differing only by case are rejected"""
+        self.env['material.supplier'].create({'name': 'Case Supplier'})
+        
+        from psycopg2.errors import UniqueViolation
+        with self.assertRaises(UniqueViolation):
+            with self.env.cr.savepoint():
+                self.env['material.supplier'].create({'name': 'CASE supplier'})
+
+    def test_supplier_find_by_name(self):
+        """Test case-insensitive supplier lookup by name"""
+        supplier = self.env['material.supplier'].create({'name': 'Lookup Supplier'})
+        Supplier = self.env['material.supplier']
+        
+        self.assertEqual(Supplier._find_by_name('LOOKUP supplier'), supplier)
+        self.assertFalse(Supplier._find_by_name('Lookup'))
+        
+        supplier.action_archive()
+        self.assertFalse(Supplier._find_by_name('lookup supplier'))
+        self.assertEqual(Supplier._find_by_name('lookup supplier', include_archived=True), supplier)
+        
+        # Pending ORM writes are flushed before the lookup query
+        supplier.write({'name': 'Renamed Lookup Supplier', 'active': True})
+        self.assertEqual(Supplier._find_by_name('renamed lookup supplier'), supplier)
+
+    def test_supplier_search_page(self):
+        """Test keyset pagination walks all suppliers once, ordered by name ignoring case"""
+        Supplier = self.env['material.supplier']
+        created = Supplier.create([{'name': name} for name in ['page b', 'Page A', 'PAGE C', 'page d']])
+        created[3].action_archive()
+        
+        seen, total, after = Supplier, 0, None
+        while True:
+            page, after = Supplier._search_page(after, limit=2)
+            self.assertLessEqual(len(page), 2)
+            seen |= page
+            total += len(page)
+            if after is None:
+                break
+        
+        ours = [supplier.name for supplier in seen if supplier in created]
+        self.assertEqual(ours, ['Page A', 'page b', 'PAGE C'])
+        self.assertEqual(total, len(seen))
+        self.assertEqual(total, Supplier.search_count([]))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+from ..models import autocomplete
+
+
+class TestWarmup(TransactionCase):
+
+    def test_warm_up(self):
+        """Test the warm-up builds the autocomplete indexes and times every step"""
+        supplier = self.env['material.supplier'].create({'name': 'Warmup Supplier'})
+        self.env['material.material'].create({
+            'material_code': 'WRM001',
+            'material_name': 'Warmup Fabric',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': supplier.id
+        })
+        self.env['material.material'].flush()
+        
+        timings = self.env['material.warmup'].warm_up()
+        
+        for step in ('config', 'autocomplete', 'prewarm', 'materials_cold', 'materials_warm',
+                     'materials_fabric_cold', 'suppliers_cold', 'total'):
+            self.assertIn(step, timings)
+        index = autocomplete._indexes.get((self.env.cr.dbname, 'material.material'))
+        self.assertTrue(index)
+        self.assertTrue(index.search('warmup'))